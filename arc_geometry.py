@@ -0,0 +1,52 @@
+from math import sin, cos, acos, radians, degrees, ceil
+
+#-----Arc Geometry---------------------------------------------------#
+# Turtle draws every circle with a segment count that hardly depends
+# on its size, so a tiny eye gets as many chords as a big wave.  Here
+# the number of chords is worked out from the radius instead: just
+# enough that no chord strays further than a given tolerance (in
+# pixels) from the true arc.  The chord ends lie exactly on the circle,
+# so the pen finishes exactly where turtle's circle would leave it.
+#
+# Arcs are worked out in the turtle's own frame of reference (heading
+# along the x axis, left along the y axis), where the centre of a
+# circle of radius r is (0, r) and the point reached after turning
+# through angle a is (|r| sin a, r (1 - cos a)).  The points of an
+# arc of radius 1 only depend on the extent and chord count, so they
+# are calculated once and scaled for every other radius.
+
+default_tolerance = 0.5 # pixels
+
+def arc_segments(radius, extent, tolerance = default_tolerance):
+    radius = abs(radius)
+    if radius <= tolerance / 2:
+        return 1
+    # A chord spanning angle a strays r (1 - cos(a / 2)) from the arc
+    largest_angle = 2 * degrees(acos(1 - tolerance / radius))
+    return max(1, ceil(abs(extent) / largest_angle))
+
+unit_arcs = {}
+
+def unit_arc(extent, segments):
+    key = (extent, segments)
+    if key not in unit_arcs:
+        points = []
+        for segment in range(1, segments + 1):
+            angle = radians(extent * segment / segments)
+            points.append((sin(angle), 1 - cos(angle)))
+        unit_arcs[key] = points
+    return unit_arcs[key]
+
+# The chord ends of an arc starting at (x, y) with the given heading,
+# using turtle's conventions for negative radius and extent
+def arc_points(x, y, heading, radius, extent, segments):
+    heading = radians(heading)
+    heading_x, heading_y = cos(heading), sin(heading)
+    points = []
+    for unit_x, unit_y in unit_arc(extent, segments):
+        along, across = abs(radius) * unit_x, radius * unit_y
+        points.append((x + along * heading_x - across * heading_y,
+                       y + along * heading_y + across * heading_x))
+    return points
+
+#--------------------------------------------------------------------#
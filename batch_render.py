@@ -0,0 +1,114 @@
+import argparse
+from os import makedirs
+from os.path import join
+from multiprocessing import Pool
+
+import contact_tracer4
+
+#-----Batch Rendering------------------------------------------------#
+# Render the journeys for a whole range of seeds across a pool of
+# worker processes, one file per seed.  The seed drives both the data
+# set and the random details of the tiles, so the file produced for a
+# seed never depends on how many workers there are or which of them
+# happened to pick it up.
+
+output_formats = ['svg', 'png']
+
+# With shared tiles (PNG only), every journey's tiles take their random
+# details from this seed instead of the journey's, so that one tile
+# atlas (see tile_atlas) in shared memory serves every worker.  Workers
+# then blit from the atlas rather than each rasterising its own copy
+# of every tile, so their memory doesn't grow with the worker count.
+shared_tile_seed = 0
+
+# The atlas this process blits from, if tiles are shared
+worker_atlas = None
+
+# Pool initialiser: attach to the atlas and take the tiles' display
+# lists from it, so nothing is recorded or rasterised in the worker
+def attach_atlas(manifest, display_lists):
+    global worker_atlas
+    from tile_atlas import TileAtlas
+    worker_atlas = TileAtlas(manifest, display_lists)
+    worker_atlas.warm_tile_cache()
+
+def render_seed(seed, output_dir = '.', output_format = 'svg'):
+    if worker_atlas is not None:
+        decoration_seed = shared_tile_seed
+    else:
+        # Tiles are seeded per journey, so keep only this seed's tiles
+        # around
+        contact_tracer4.tile_cache.clear()
+        decoration_seed = seed
+    data = contact_tracer4.data_set(seed, verbose = False)
+    backend = contact_tracer4.render_headless(data, decoration_seed)
+    file_name = join(output_dir, 'journey_{}.{}'.format(seed, output_format))
+    if output_format == 'png':
+        from png_raster import write_png
+        tiles = worker_atlas.tiles() if worker_atlas is not None else None
+        write_png(backend, file_name, tiles = tiles)
+    else:
+        from svg_export import write_svg
+        write_svg(backend, file_name)
+    return file_name
+
+# Pool workers can only be handed one argument
+def render_job(job):
+    return render_seed(*job)
+
+def render_seeds(seeds, workers = 1, output_dir = '.', output_format = 'svg',
+                 chunk_size = 16, shared_tiles = False):
+    global worker_atlas
+    if output_format not in output_formats:
+        raise ValueError('Output format must be one of ' + str(output_formats))
+    if shared_tiles and output_format != 'png':
+        raise ValueError('Shared tiles are only used for PNG output')
+    makedirs(output_dir, exist_ok = True)
+    jobs = [(seed, output_dir, output_format) for seed in seeds]
+
+    atlas = None
+    initialiser, initialiser_args = None, ()
+    if shared_tiles:
+        from tile_atlas import prerender_tiles
+        atlas = prerender_tiles(decoration_seed = shared_tile_seed,
+                                workers = workers)
+        initialiser = attach_atlas
+        initialiser_args = (atlas.manifest, atlas.display_lists)
+    try:
+        if workers <= 1:
+            if atlas is not None:
+                worker_atlas = atlas
+                atlas.warm_tile_cache()
+            return [render_job(job) for job in jobs]
+        with Pool(workers, initialiser, initialiser_args) as pool:
+            return list(pool.imap(render_job, jobs, chunk_size))
+    finally:
+        worker_atlas = None
+        if atlas is not None:
+            atlas.close()
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Command Line---------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Render one journey image per seed.')
+    parser.add_argument('first_seed', type = int)
+    parser.add_argument('last_seed', type = int, help = 'inclusive')
+    parser.add_argument('--workers', type = int, default = 1)
+    parser.add_argument('--output-dir', default = 'journeys')
+    parser.add_argument('--format', choices = output_formats, default = 'svg')
+    parser.add_argument('--shared-tiles', action = 'store_true',
+                        help = 'blit PNG tiles from one shared atlas '
+                               '(tile details no longer vary by seed)')
+    args = parser.parse_args()
+
+    written = render_seeds(range(args.first_seed, args.last_seed + 1),
+                           args.workers, args.output_dir, args.format,
+                           shared_tiles = args.shared_tiles)
+    print('Rendered', len(written), 'journeys to', args.output_dir)
+
+#--------------------------------------------------------------------#
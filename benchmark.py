@@ -0,0 +1,199 @@
+import json
+import time
+import argparse
+import tracemalloc
+from random import Random
+
+import contact_tracer4
+from display_list import RecordingPen
+from headless_turtle import HeadlessTurtle
+
+#-----Counting Backend-----------------------------------------------#
+# A headless backend that also counts how often each drawing primitive
+# is called, so we can see how much turtle work each image costs.  The
+# pens tiles are recorded with (see contact_tracer4.record_tile) count
+# their calls into the same totals, so a journey's count includes the
+# work of drawing every tile it records.
+
+class CountingBackend:
+
+    def __init__(self, backend = None, primitives = None, calls = None):
+        if backend is None:
+            backend = HeadlessTurtle()
+        if primitives is None:
+            primitives = contact_tracer4.drawing_primitives
+        self.backend = backend
+        self.calls = {} if calls is None else calls
+        for name in primitives:
+            setattr(self, name, self.counted(name))
+
+    # Everything that isn't counted is passed straight to the backend
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    # A recording pen for contact_tracer4.tile_pen, counted here too
+    def tile_pen(self, width_scale = 1):
+        return CountingBackend(RecordingPen(width_scale = width_scale),
+                               contact_tracer4.pen_primitives, self.calls)
+
+    def counted(self, name):
+        primitive = getattr(self.backend, name)
+        def counted_primitive(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return primitive(*args, **kwargs)
+        return counted_primitive
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Benchmarks-----------------------------------------------------#
+# Each benchmark draws onto a fresh counting backend and records the
+# primitive calls made, the best wall time over a few repeats and the
+# peak memory allocated while drawing.
+
+shape_functions = ['bird', 'leaving_home', 'mountain_trip', 'beach_trip',
+                   'ocean_trip', 'image_key']
+
+default_seeds = list(range(10))
+
+def measure(draw, repeats = 5):
+    saved = {}
+    for name in contact_tracer4.drawing_primitives + ['tile_pen']:
+        saved[name] = getattr(contact_tracer4, name)
+    try:
+        best_time = None
+        for repeat in range(repeats):
+            counter = CountingBackend()
+            contact_tracer4.use_backend(counter)
+            contact_tracer4.tile_pen = counter.tile_pen
+            # Tiles are recorded on first use, so start each run cold
+            contact_tracer4.tile_cache.clear()
+            start = time.perf_counter()
+            draw()
+            elapsed = time.perf_counter() - start
+            if best_time is None or elapsed < best_time:
+                best_time = elapsed
+
+        # Measure memory separately, as tracing slows drawing down
+        counter = CountingBackend()
+        contact_tracer4.use_backend(counter)
+        contact_tracer4.tile_pen = counter.tile_pen
+        contact_tracer4.tile_cache.clear()
+        tracemalloc.start()
+        draw()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        for name, primitive in saved.items():
+            setattr(contact_tracer4, name, primitive)
+    return {'calls': counter.total_calls(),
+            'calls_by_primitive': dict(sorted(counter.calls.items())),
+            'seconds': best_time,
+            'peak_bytes': peak_memory}
+
+# Random details are seeded so every run draws exactly the same thing
+def shape_benchmark(name):
+    draw = getattr(contact_tracer4, name)
+    if name == 'bird':
+        # The bird is drawn relative to the start of the image around it
+        def draw_shape():
+            contact_tracer4.start_pos[0:2] = [0, 0]
+            draw(100)
+    elif name == 'image_key':
+        def draw_shape():
+            draw(0)
+    else:
+        def draw_shape():
+            draw(100, Random(0))
+    return draw_shape
+
+def journey_benchmark(seed):
+    data = contact_tracer4.data_set(seed, verbose = False)
+    def draw_journey():
+        contact_tracer4.create_drawing_canvas(label_spaces = False)
+        contact_tracer4.visualise(data, seed)
+    return draw_journey
+
+def run_benchmarks(seeds = default_seeds, repeats = 5):
+    results = {}
+    for name in shape_functions:
+        results[name] = measure(shape_benchmark(name), repeats)
+    for seed in seeds:
+        results['visualise_seed_{}'.format(seed)] = \
+            measure(journey_benchmark(seed), repeats)
+    return results
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Baselines------------------------------------------------------#
+# Results are stored as JSON so a later version can be compared with
+# them.  Any increase in primitive calls counts as a regression, while
+# time and memory are allowed some noise.
+
+time_tolerance = 1.25
+memory_tolerance = 1.25
+
+def regressions(baseline, results):
+    found = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        if result['calls'] > before['calls']:
+            found.append('{}: {} primitive calls, was {}'.format(
+                name, result['calls'], before['calls']))
+        if result['seconds'] > before['seconds'] * time_tolerance:
+            found.append('{}: {:.4f}s, was {:.4f}s'.format(
+                name, result['seconds'], before['seconds']))
+        if result['peak_bytes'] > before['peak_bytes'] * memory_tolerance:
+            found.append('{}: {} bytes peak, was {}'.format(
+                name, result['peak_bytes'], before['peak_bytes']))
+    return found
+
+def print_results(results):
+    print('{:<22}{:>10}{:>12}{:>14}'.format('benchmark', 'calls',
+                                             'seconds', 'peak bytes'))
+    for name, result in results.items():
+        print('{:<22}{:>10}{:>12.5f}{:>14}'.format(
+            name, result['calls'], result['seconds'], result['peak_bytes']))
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Command Line---------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Time the drawing functions and whole journeys.')
+    parser.add_argument('--seeds', type = int, nargs = '*',
+                        default = default_seeds)
+    parser.add_argument('--repeats', type = int, default = 5)
+    parser.add_argument('--save', metavar = 'FILE',
+                        help = 'store the results as a baseline')
+    parser.add_argument('--compare', metavar = 'FILE',
+                        help = 'report regressions against a baseline')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.seeds, args.repeats)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent = 2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            found = regressions(json.load(baseline_file), results)
+        for regression in found:
+            print('REGRESSION', regression)
+        if found:
+            raise SystemExit(1)
+
+#--------------------------------------------------------------------#
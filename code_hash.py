@@ -0,0 +1,30 @@
+import hashlib
+from os.path import join, dirname, abspath
+
+#-----Rendering Code Hash--------------------------------------------#
+# A hash of the source of every module that decides what a drawing
+# looks like, so caches of drawn things (see render_cache and
+# static_layer) can tell when the code behind them has changed.  Any
+# module that affects the pictures belongs in this one list.
+
+rendering_modules = ['contact_tracer4', 'display_list', 'arc_geometry',
+                     'headless_turtle', 'journey_compiler', 'svg_export',
+                     'png_raster', 'colours', 'grid_geometry',
+                     'grid_coordinates', 'variant_registry', 'render_cache',
+                     'static_layer']
+
+# The code can't change while we are running, so only hash it once
+code_hash = None
+
+def rendering_code_hash():
+    global code_hash
+    if code_hash is None:
+        digest = hashlib.sha256()
+        for module_name in rendering_modules:
+            with open(join(dirname(abspath(__file__)), module_name + '.py'),
+                      'rb') as source:
+                digest.update(source.read())
+        code_hash = digest.hexdigest()
+    return code_hash
+
+#--------------------------------------------------------------------#
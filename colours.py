@@ -0,0 +1,25 @@
+#-----Colours--------------------------------------------------------#
+# The Tk colour names used by the drawing functions, for the exporters
+# that can't ask Tk.  Tk follows the X11 colour table, so 'green' is
+# pure green rather than the darker CSS one, and exporters must use
+# these values rather than pass the names on.
+named_colours = {
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'yellow': (255, 255, 0),
+    'brown': (165, 42, 42),
+    'dark green': (0, 100, 0),
+    'light grey': (211, 211, 211),
+    'slate grey': (112, 128, 144),
+}
+
+def rgb(colour):
+    if colour.startswith('#') and len(colour) == 7:
+        return tuple(int(colour[pos:pos + 2], 16) for pos in (1, 3, 5))
+    if colour.lower() in named_colours:
+        return named_colours[colour.lower()]
+    raise ValueError('Unknown colour ' + repr(colour))
+
+#--------------------------------------------------------------------#
@@ -1,26 +1,74 @@
-from turtle import *
 from math import *
 from random import *
 from sys import exit as abort
-from os.path import isfile
+from display_list import RecordingPen
+from journey_compiler import paint_operations, compile_journey, \
+     follow_instruction
+from refresh_policy import every_tiles, frame_budget, at_end
+from grid_geometry import GridGeometry
+from grid_coordinates import column_label
+from variant_registry import registry
 
 # Define constant values used in the main program that sets up
 # the drawing canvas.  
 cell_size = 100 # pixels (default is 100)
 grid_width = 9 # squares (default is 9)
 grid_height = 7 # squares (default is 7)
-x_margin = cell_size * 2.75 # pixels, the size of the margin left/right of the grid
-y_margin = cell_size // 2 # pixels, the size of the margin below/above the grid
-window_height = grid_height * cell_size + y_margin * 2
-window_width = grid_width * cell_size + x_margin * 2
-small_font = ('Arial', cell_size // 5, 'normal') # font for the coords
-big_font = ('Arial', cell_size // 4, 'normal') # font for any other text
 
 # Validity checks on grid size - do not change this code
 assert cell_size >= 80, 'Cells must be at least 80x80 pixels in size'
 assert grid_width >= 8, 'Grid must be at least 8 squares wide'
 assert grid_height >= 6, 'Grid must be at least 6 squares high'
 
+# Where the grid, key and everything else go (see grid_geometry).  Other
+# grid and cell sizes can be drawn by switching to another geometry.
+geometry = GridGeometry(cell_size, grid_width, grid_height)
+
+def use_geometry(new_geometry):
+    global geometry
+    geometry = new_geometry
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Drawing Backend------------------------------------------------#
+# All drawing goes through the turtle-style functions below.  They come
+# from the Tk backend by default, but any object providing the same
+# functions (such as headless_turtle.HeadlessTurtle) can be swapped in,
+# e.g. to render without a display.
+drawing_primitives = ['setup', 'bgcolor', 'title', 'tracer', 'update',
+                      'speed', 'hideturtle', 'done', 'penup', 'pendown',
+                      'color', 'pencolor', 'fillcolor', 'width', 'home',
+                      'goto', 'forward', 'backward', 'left', 'right',
+                      'setheading', 'circle', 'xcor', 'ycor',
+                      'begin_fill', 'end_fill', 'write', 'dot',
+                      'place_tile', 'draw_items']
+
+def use_backend(backend):
+    for name in drawing_primitives:
+        globals()[name] = getattr(backend, name)
+
+def use_tk_backend():
+    import tk_backend
+    use_backend(tk_backend)
+
+# Importing this module must not open a window (or even load turtle and
+# tkinter), so until a backend is chosen each drawing function is a
+# stand-in that switches to the Tk backend the first time it is called
+def tk_on_first_use(name):
+    def primitive(*args, **kwargs):
+        use_tk_backend()
+        return globals()[name](*args, **kwargs)
+    primitive.__name__ = name
+    return primitive
+
+def use_tk_on_first_use():
+    for name in drawing_primitives:
+        globals()[name] = tk_on_first_use(name)
+
+use_tk_on_first_use()
+
 #--------------------------------------------------------------------#
 
 
@@ -34,7 +82,7 @@ def create_drawing_canvas(bg_colour = 'light grey',
     
     # Set up the drawing canvas with enough space for the grid and
     # spaces on either side
-    setup(window_width, window_height)
+    setup(geometry.window_width, geometry.window_height)
     bgcolor(bg_colour)
 
     # Draw as quickly as possible
@@ -43,11 +91,13 @@ def create_drawing_canvas(bg_colour = 'light grey',
     # Get ready to draw the grid
     penup()
     color(line_colour)
-    width(2)
+    width(geometry.line_width)
 
     # Determine the left-bottom coords of the grid
-    left_edge = -(grid_width * cell_size) // 2 
-    bottom_edge = -(grid_height * cell_size) // 2
+    cell_size = geometry.cell_size
+    grid_width, grid_height = geometry.grid_width, geometry.grid_height
+    left_edge = geometry.left_edge
+    bottom_edge = geometry.bottom_edge
 
     # Optionally draw the grid
     if draw_grid:
@@ -71,16 +121,16 @@ def create_drawing_canvas(bg_colour = 'light grey',
         # Draw each of the labels on the x axis
         penup()
         y_offset = cell_size // 3 # pixels
-        for x_label in range(0, grid_width):
+        for x_label in range(0, grid_width if geometry.labelled else 0):
             goto(left_edge + (x_label * cell_size) + (cell_size // 2), bottom_edge - y_offset)
-            write(chr(x_label + ord('a')), align = 'center', font = small_font)
+            write(column_label(x_label), align = 'center', font = geometry.small_font)
 
         # Draw each of the labels on the y axis
         penup()
         x_offset, y_offset = cell_size // 10, cell_size // 10 # pixels
-        for y_label in range(0, grid_height):
+        for y_label in range(0, grid_height if geometry.labelled else 0):
             goto(left_edge - x_offset, bottom_edge + (y_label * cell_size) + (cell_size // 2) - y_offset)
-            write(str(y_label + 1), align = 'right', font = small_font)
+            write(str(y_label + 1), align = 'right', font = geometry.small_font)
 
         # Mark centre coordinate (0, 0)
         home()
@@ -88,11 +138,12 @@ def create_drawing_canvas(bg_colour = 'light grey',
 
     if label_spaces:
         # Left side
-        goto(-((grid_width + 1.5) * cell_size) // 2, -(cell_size // 3))
-        write('This space\nintentionally\nleft blank', align = 'right', font = big_font)    
+        panel_size = geometry.panel_size
+        goto(left_edge - panel_size * 3 // 4, -(panel_size // 3))
+        write('This space\nintentionally\nleft blank', align = 'right', font = geometry.big_font)    
         # Right side
-        goto(((grid_width + 1.5) * cell_size) // 2, -(cell_size // 3))
-        write('This space\nintentionally\nleft blank', align = 'left', font = big_font)    
+        goto(geometry.right_edge + panel_size * 3 // 4, -(panel_size // 3))
+        write('This space\nintentionally\nleft blank', align = 'left', font = geometry.big_font)    
 
     pencolor('black')
     width(1)
@@ -112,7 +163,7 @@ def release_drawing_canvas(hide_cursor = True):
 
 #-----Draw Images---------------------------------------------#
 # Create a list to save the starting position of each image
-start_pos = [xcor(), ycor()] 
+start_pos = [0, 0] 
 
 # Function to start drawing and filling
 def begin(): 
@@ -303,7 +354,7 @@ def bird(size):
         circle(bird_size, 60)
         right(90)
 
-def leaving_home(size = 100):
+def leaving_home(size = 100, rng = None):
     # Save start position of image and set correct start direction
     start_pos[0] = xcor()
     start_pos[1] = ycor()
@@ -502,7 +553,7 @@ def mountain_tree(size):
         left(120)
     end()
       
-def mountain_trip(size = 100):
+def mountain_trip(size = 100, rng = None):
     # Save start position of image and set correct start direction
     start_pos[0] = xcor()
     start_pos[1] = ycor()
@@ -649,7 +700,7 @@ def mountain_trip(size = 100):
     setheading(0)
     goto(start_pos[0], start_pos[1])
     
-def beach_trip(size = 100):
+def beach_trip(size = 100, rng = None):
     # Save start position of image and set correct start direction
     start_pos[0] = xcor()
     start_pos[1] = ycor()
@@ -870,8 +921,10 @@ def beach_trip(size = 100):
     setheading(0)
     goto(start_pos[0], start_pos[1])
     
-def thunder_clouds(cloud_size, lightning = 0):
-    cloud_col = randint(1, 5) # Choose a random cloud colour from list
+def thunder_clouds(cloud_size, lightning = 0, rng = None):
+    if rng is None:
+        rng = Random()
+    cloud_col = rng.randint(1, 5) # Choose a random cloud colour from list
     
     if cloud_col == 1:
         fillcolor('white')
@@ -945,7 +998,12 @@ def rain_drop(size):
     
     end()
     
-def ocean_trip(size = 100):
+def ocean_trip(size = 100, rng = None):
+    # Rain drops and clouds are placed at random, using the random
+    # number generator given (if any) so the result can be repeated
+    if rng is None:
+        rng = Random()
+
     # Save start position of image and set correct start direction
     start_pos[0] = xcor()
     start_pos[1] = ycor()
@@ -964,7 +1022,7 @@ def ocean_trip(size = 100):
     # Draw in rain drops
     for rain_drop_column in range(10):
         for rain_drop_row in range(10):
-            rain_drop_chance = randint(1,3)
+            rain_drop_chance = rng.randint(1,3)
             if  rain_drop_chance == 1:
                 rain_drop(size)
             setheading(0)
@@ -1020,8 +1078,8 @@ def ocean_trip(size = 100):
     
     # Decide if clouds should have lightning and draw clouds
     for clouds in range(4):
-        clouds_lightning = randint(1, 3)
-        thunder_clouds(size / 6, clouds_lightning)
+        clouds_lightning = rng.randint(1, 3)
+        thunder_clouds(size / 6, clouds_lightning, rng)
         cloud_pos[0] = cloud_pos[0] + (size / 4.5)
         goto(cloud_pos[0], cloud_pos[1])
 
@@ -1136,202 +1194,357 @@ def ocean_trip(size = 100):
     setheading(0)
     goto(start_pos[0], start_pos[1])
 
+# The drawing functions of the variants (see variant_registry)
+registry['A'].draw = leaving_home
+registry['B'].draw = mountain_trip
+registry['C'].draw = beach_trip
+registry['D'].draw = ocean_trip
+
 # Set style for text
 font_style = ('Arial', 12, 'normal')
 title_style = ('Arial', 18, 'normal')
 
 
-# Draw images as key on right hand side with labels
-def image_key():
+# Draw images of every variant as key on right hand side with labels
+def image_key(decoration_seed = None):
+    size, step, gap = geometry.panel_size, geometry.key_step, geometry.key_gap
     penup()
-    goto(500, 300)
+    goto(geometry.key_position)
 
     # Draw in title
     color('black')
     write('A Birds Adventure', align = 'left', font = title_style)
     setheading(270)
-    forward(125)    
+    forward(step)    
     
     # Draw in images with text
-    leaving_home()
-    setheading(270)
-    forward(25)
-    color('black')
-    write('A. Leaving Home', align = 'left', font = font_style)
-    forward(125)
+    for number, variant in enumerate(registry.values()):
+        if number > 0:
+            forward(step)
+        variant.draw(size, Random(decoration_seed))
+        setheading(270)
+        forward(gap)
+        color('black')
+        write(variant.key_label(), align = 'left', font = font_style)
+
+
+#-----Tile Cache-----------------------------------------------------#
+# Every cell showing the same variant looks the same, so each variant
+# is recorded once into a display list relative to its bottom-left
+# corner and then stamped into later cells instead of being redrawn
+# turtle step by turtle step.  Random details, like the ocean trip's
+# rain and clouds, are drawn from a generator seeded with the given
+# decoration seed, so the same seed always gives the same tile.
+
+# The turtle functions used by the image drawing functions
+pen_primitives = ['goto', 'forward', 'backward', 'left', 'right',
+                  'setheading', 'xcor', 'ycor', 'circle', 'penup',
+                  'pendown', 'fillcolor', 'begin_fill', 'end_fill']
+
+# Display lists already recorded, keyed by drawing function, size and
+# decoration seed
+tile_cache = {}
+
+# Makes the pen tiles are recorded with (replaceable, e.g. for profiling)
+tile_pen = RecordingPen
+
+# Record an image drawing function into a display list by pointing the
+# turtle functions it calls at a recording pen for the duration.  The
+# pictures were designed at 100 pixels, so their lines are scaled with
+# them.
+def record_tile(draw, size = 100, decoration_seed = None):
+    pen = tile_pen(width_scale = size / 100)
+    saved = {}
+    for name in pen_primitives:
+        saved[name] = globals()[name]
+        globals()[name] = getattr(pen, name)
+    try:
+        draw(size, Random(decoration_seed))
+    finally:
+        globals().update(saved)
+    return pen.display_list()
+
+# The display list for an image, recording it the first time
+def cached_tile(draw, size = 100, decoration_seed = None):
+    key = (draw, size, decoration_seed)
+    if key not in tile_cache:
+        tile_cache[key] = record_tile(draw, size, decoration_seed)
+    return tile_cache[key]
+
+# Record every registered variant at the given sizes ahead of time, so
+# the journey itself only ever stamps tiles
+def prewarm_tiles(sizes = None, decoration_seed = None):
+    if sizes is None:
+        sizes = [geometry.cell_size, geometry.panel_size]
+    for variant in registry.values():
+        for size in sizes:
+            cached_tile(variant.draw, size, decoration_seed)
+
+# The name a tile is placed under, e.g. 'ocean_trip-100-7'
+def tile_name(draw, size = 100, decoration_seed = None):
+    name = '{}-{}'.format(draw.__name__, size)
+    if decoration_seed is not None:
+        name = name + '-' + str(decoration_seed)
+    return name
+
+# Stamp an image at the turtle's position, recording it the first time
+def stamp_tile(draw, size = 100, decoration_seed = None):
+    items = cached_tile(draw, size, decoration_seed)
+    place_tile(tile_name(draw, size, decoration_seed), items)
+    setheading(0)
 
-    mountain_trip()
-    setheading(270)
-    forward(25)
-    color('black')
-    write('B. Mountain Trip', align = 'left', font = font_style)
-    forward(125)
+#--------------------------------------------------------------------#
+
+
+
+# Go to the bottom left corner of a cell, counting columns and rows
+# from 0 at the bottom left of the grid
+def go_to_cell(column, row):
+    goto(geometry.cell_origin(column, row))
+
+# Drawing image based on the given letter, as big as a cell unless
+# told otherwise
+def draw_image(letter, decoration_seed = None, size = None):
+    if size is None:
+        size = geometry.cell_size
+    if letter in registry:
+        stamp_tile(registry[letter].draw, size, decoration_seed)
+
+def visualise(data, decoration_seed = None, skip_overwritten = True,
+              refresh = None, draw_key = True):
+    if draw_key: # (unless it is already there, see draw_static_layer)
+        image_key(decoration_seed) # Draw key on right hand side of screen
+    image_letter = ''  # The final variant, in case nothing gets painted
+
+    # Work out which image goes in which cell from the instructions (see
+    # journey_compiler), normally leaving out images that later ones
+    # would cover up anyway
+    if skip_overwritten:
+        paints = compile_journey(data)
+    else:
+        paints = paint_operations(data)
+
+    # Show the drawing after every image unless told otherwise (see
+    # refresh_policy, or frame_export for recording frames instead)
+    if refresh is None:
+        refresh = every_tiles(1)
+    refresh.start(update)
+
+    # Loop that draws each image in its cell, keeping the number of the
+    # journey step that painted it so a profiler can tell which step
+    # the drawing belongs to
+    for (column, row), image_letter, step in paints:
+        go_to_cell(column, row)
+        draw_image(image_letter, decoration_seed)
+        refresh.tile_drawn()
+    step = None # what follows doesn't belong to any one step
+    refresh.finish()
 
-    beach_trip()
-    setheading(270)
-    forward(25)
-    color('black')
-    write('C. Beach Trip', align = 'left', font = font_style)
-    forward(125)
-    
-    ocean_trip()
-    setheading(270)
-    forward(25)
-    color('black')
-    write('D. Ocean Trip', align = 'left', font = font_style)
-
-
-
-def visualise(data):
-    image_key() # Draw key on right hand side of screen
-    image_letter = ''  # Create letter variable to be used in functions below
-
-    # Determine starting position from instructions and go to that position
-    def start_pos(letter, number):
-        # Go to bottom left corner of grid
-        goto(-450, -350)                            
-        # Create list with letters from grid
-        column_letters = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i',] 
-        cycle_pos = 0
-        # Compare letter from instruction with letters in list
-        # If it finds a match go forward to that letters position on the grid
-        for match in column_letters:                
-            if letter == match: 
-                setheading(0)                       
-                forward(column_letters.index(match) * 100)
-            cycle_pos = cycle_pos + 1
-        setheading(90)
-        forward((number - 1) * 100)  # Go up to the starting number position
-
-    # Choosing which image to draw based on instruction letter
-    def choose_image(letter):
-        global image_letter # Setting image_letter to global to edit in function
-        if letter == 'A':
-            leaving_home()
-            image_letter = 'A'
-        elif letter == 'B':
-            mountain_trip()
-            image_letter = 'B'
-        elif letter == 'C':
-            beach_trip()
-            image_letter = 'C'
-        elif letter == 'D':
-            ocean_trip()
-            image_letter = 'D'
-            
-    # Drawing image based on currently selected letter 
-    def draw_image():
-        global image_letter # Setting image_letter to global to edit in function
-        if image_letter == 'A':
-            leaving_home()
-        elif image_letter == 'B':
-            mountain_trip()
-        elif image_letter == 'C':
-            beach_trip()
-        elif image_letter == 'D':
-            ocean_trip()
-        
-    # Loop that cycles through each     
-    for instruction in data:
-        number_of_steps = instruction[1] # Saves the number of steps to loop through
-        # Checks if the current position of variable data_location is in the
-        # first position of the list
-        if instruction[0] == 'Start':
-            # Chooses starting position based on instructions
-            start_pos(instruction[1], instruction[2])
-            # Chooses image based on the first instruction
-            choose_image(instruction[3])
-            update()
-
-        # Checks if the instruction contains a change instruction
-        elif instruction[0] == 'Change':
-            # Draws the image it is changed to and sets variable to be for that image
-            choose_image(instruction[1])
-            update()
-
-        # Check direction in instruction to determine where to move and
-        # how far to move.        
-        elif number_of_steps == 0:
-            draw_image()
-            update()
-            
-        elif instruction[0] == 'North':
-            for steps in range(number_of_steps):
-                draw_image()
-                setheading(90)
-                forward(100)
-                update()
-            
-        elif instruction[0] == 'East':
-            for steps in range(number_of_steps):
-                draw_image()
-                setheading(0)
-                forward(100)
-                update()
-                
-        elif instruction[0] == 'South':
-            for steps in range(number_of_steps):
-                draw_image()
-                setheading(270)
-                forward(100)
-                update()
-                
-        elif instruction[0] == 'West':
-            for steps in range(number_of_steps):
-                draw_image()
-                setheading(180)
-                forward(100)
-                update()
-                      
     # Draw final variant on left hand side of screen
-    goto(-600, -50)
-    draw_image()
-    setheading(90)
-    forward(125)
-    color('black')
-    write('Final variant:', align = 'left', font = font_style)
+    draw_final_variant(image_letter, decoration_seed)
+
+# The panel showing the final variant, optionally without its label
+# when only the image needs replacing
+def draw_final_variant(letter, decoration_seed = None, label = True):
+    goto(geometry.final_position)
+    draw_image(letter, decoration_seed, geometry.panel_size)
+    if label:
+        setheading(90)
+        forward(geometry.key_step)
+        color('black')
+        write('Final variant:', align = 'left', font = font_style)
             
 #--------------------------------------------------------------------#
 
 
 
+#-----Incremental Rendering------------------------------------------#
+# For journeys that arrive an instruction at a time (e.g. from a live
+# feed).  The renderer remembers where the journey has got to, so each
+# new instruction only paints the cells it touches, plus the final
+# variant panel if the variant changed, instead of visualise drawing
+# the whole list again.  The canvas and key have to be drawn first
+# (see create_drawing_canvas and draw_static_layer).
+#
+# feed returns the rectangles that were repainted, as (left, bottom,
+# right, top) in turtle coordinates, so a caller keeping its own copy
+# of the picture knows what to refresh.
+
+class IncrementalRenderer:
+
+    def __init__(self, decoration_seed = None, refresh = None,
+                 bg_colour = 'light grey'):
+        self.decoration_seed = decoration_seed
+        self.bg_colour = bg_colour # for clearing the final variant panel
+        self.cell = None
+        self.image_letter = ''
+        self.panel_letter = ''
+        # Show each instruction as soon as it is drawn unless told
+        # otherwise (see refresh_policy)
+        self.refresh = at_end() if refresh is None else refresh
+        self.refresh.start(update)
+
+    def feed(self, instruction):
+        paints, self.cell, self.image_letter = \
+            follow_instruction(instruction, self.cell, self.image_letter)
+        dirty = []
+        for (column, row), letter in paints:
+            go_to_cell(column, row)
+            draw_image(letter, self.decoration_seed)
+            self.refresh.tile_drawn()
+            cell_x, cell_y = xcor(), ycor()
+            dirty.append((cell_x, cell_y, cell_x + geometry.cell_size,
+                          cell_y + geometry.cell_size))
+        if self.image_letter != self.panel_letter:
+            # Tiles don't cover every pixel of their cell, so clear away
+            # the old variant first
+            panel_x, panel_y = geometry.final_position
+            panel_size = geometry.panel_size
+            goto(panel_x - 1, panel_y - 1)
+            setheading(0)
+            color(self.bg_colour)
+            begin_fill()
+            for side in range(4):
+                forward(panel_size + 2)
+                left(90)
+            end_fill()
+            draw_final_variant(self.image_letter, self.decoration_seed,
+                               label = self.panel_letter == '')
+            self.panel_letter = self.image_letter
+            dirty.append((panel_x - 1, panel_y - 1, panel_x + panel_size + 1,
+                          panel_y + panel_size + 1))
+        self.refresh.finish()
+        return dirty
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Headless Rendering---------------------------------------------#
+# Draw onto a headless backend (a new HeadlessTurtle unless one is
+# given) and hand the backend back so its scene can be exported (see
+# svg_export) or kept
+def render_with(draw, backend = None):
+    if backend is None:
+        from headless_turtle import HeadlessTurtle
+        backend = HeadlessTurtle()
+    saved = {}
+    for name in drawing_primitives:
+        saved[name] = globals()[name]
+    use_backend(backend)
+    try:
+        draw()
+    finally:
+        globals().update(saved)
+    return backend
+
+# Draw the canvas, key and a journey
+def render_headless(data, decoration_seed = None, backend = None):
+    def draw():
+        create_drawing_canvas(label_spaces = False)
+        title("A birds adventure")
+        visualise(data, decoration_seed)
+    return render_with(draw, backend)
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Static Layer---------------------------------------------------#
+# The grid, its labels and the key are the same for every journey, so
+# they can be drawn once and kept as a list of items (see static_layer
+# for the cache) which is then put on the canvas in a single call
+
+def render_static_layer(label_spaces = False, decoration_seed = None):
+    def draw():
+        create_drawing_canvas(label_spaces = label_spaces)
+        image_key(decoration_seed)
+    backend = render_with(draw)
+    return {'window_size': list(backend.window_size),
+            'background': backend.background,
+            'items': backend.scene()}
+
+# Use instead of create_drawing_canvas (and then visualise with
+# draw_key = False)
+def draw_static_layer(layer):
+    setup(*layer['window_size'])
+    bgcolor(layer['background'])
+    tracer(False)
+    draw_items(layer['items'])
+    pencolor('black')
+    width(1)
+    penup()
+    home()
+    tracer(True)
+
+#--------------------------------------------------------------------#
+
+
+
 #-----Initialisation Steps-------------------------------------------#
 
 ### Define the function for generating data sets, using the
 ### "raw data" function if available, but otherwise
 ### creating a dummy function that returns an empty list
-if isfile('data_generator.py'):
-    print('\nNote: Data module found\n')
-    from data_generator import raw_data
-    def data_set(new_seed = None):
-        seed(new_seed)
-        return raw_data(grid_width, grid_height)
+try:
+    from data_generator import raw_data, iter_raw_data
+    data_module_available = True
+except ImportError:
+    data_module_available = False
+
+if data_module_available:
+    def data_set(new_seed = None, verbose = True):
+        return raw_data(geometry.grid_width, geometry.grid_height,
+                        Random(new_seed), verbose)
+    # The same data set, generated silently one instruction at a time
+    # as it is consumed (e.g. visualise(data_stream(seed)))
+    def data_stream(new_seed = None):
+        return iter_raw_data(geometry.grid_width, geometry.grid_height,
+                             Random(new_seed))
 else:
-    print('\nNote: No data module available\n')
-    def data_set(dummy_parameter = None):
+    def data_set(dummy_parameter = None, verbose = True):
         return []
+    def data_stream(dummy_parameter = None):
+        return iter([])
 
 #--------------------------------------------------------------------#
 
 
 
 #-----Main Program to Create Drawing Canvas--------------------------#
+# Nothing is drawn until main is called, so the drawing functions can
+# be imported and used elsewhere
+
+def main(new_seed = None):
+    if data_module_available:
+        print('\nNote: Data module found\n')
+    else:
+        print('\nNote: No data module available\n')
+
+    # Put the grid and key on the canvas, reusing them from the last
+    # run if nothing has changed
+    from static_layer import load_static_layer
+    draw_static_layer(load_static_layer(render_static_layer,
+                                        geometry.settings(),
+                                        label_spaces = False))
+
+    # Control the drawing speed
+    speed('fastest')
+
+    # Decide whether or not to show the drawing being done step-by-step
+    tracer(False)
 
-create_drawing_canvas(label_spaces = False)
-
-# Control the drawing speed
-speed('fastest')
-
-# Decide whether or not to show the drawing being done step-by-step
-tracer(False)
+    # Give the drawing canvas a title
+    title("A birds adventure")
 
-# Give the drawing canvas a title
-title("A birds adventure")
+    # Call the function to process the data set, showing the drawing
+    # in smooth frames rather than after every single image
+    visualise(data_set(new_seed), refresh = frame_budget(), draw_key = False)
 
-# Call the function to process the data set
-visualise(data_set()) 
+    # Exit drawing
+    release_drawing_canvas()
 
-# Exit drawing
-release_drawing_canvas()
+if __name__ == '__main__':
+    main()
 
 #--------------------------------------------------------------------#
@@ -1,65 +1,191 @@
 
-from random import randint, choice
+import random
+from grid_coordinates import column_label
+from variant_registry import variant_codes
 
 #-----Data Set Function------------------#
 # The function creates a random data set defining the overall image to draw. 
 
-def raw_data(width = 1, height = 1):
+# Produce the data set one item at a time, without keeping the items
+# or printing them, so it can be consumed as it is being generated.
+# Pass a function such as print as log to see each item as it goes.
+def iter_raw_data(width = 1, height = 1, rng = None, log = None):
+
+    # Use the shared random number generator unless we are given our
+    # own (e.g. a random.Random instance, so threads don't interfere)
+    if rng is None:
+        rng = random
     
-    # Define the variants
-    variants = ['A', 'B', 'C', 'D']
+    # Define the variants (see variant_registry)
+    variants = variant_codes()
     # Define the directions we can move
     directions = ['North', 'South', 'East', 'West']
     # Choose the total number of data items
     # (in addition to the 'start' item)
-    num_data = randint(0, 100)
+    num_data = rng.randint(0, 100)
     # Define the likelihood of mutating
     mutation_probability = 20 # percent 
 
     # Choose the starting point
-    x_start = randint(0, width - 1)
-    y_start = randint(0, height - 1)
+    x_start = rng.randint(0, width - 1)
+    y_start = rng.randint(0, height - 1)
     # Choose the first variant
-    variant = choice(variants)
-    # Initialise the data set with the first location and variant
+    variant = rng.choice(variants)
+    # Start with the first location and variant
     location = [x_start, y_start]
-    data_items = [['Start', chr(ord('a') + x_start), y_start + 1, variant]]
+    data_item = ['Start', column_label(x_start), y_start + 1, variant]
+    if log is not None:
+        log(data_item)
+    yield data_item
 
-    # Add the individual data items
+    # Produce the individual data items
     for datum in range(0, num_data):
-        if randint(1, 100) <= mutation_probability:
+        if rng.randint(1, 100) <= mutation_probability:
             # Choose a new variant (remembering that Python lists
             # are mutable and changes are done in-place)
             other_variants = variants.copy()
             other_variants.remove(variant)
-            variant = choice(other_variants)
-            # Add the mutation to the data set
-            data_items.append(['Change', variant])
+            variant = rng.choice(other_variants)
+            # The mutation is the next data item
+            data_item = ['Change', variant]
         else:
             # Choose direction to move
-            direction = choice(directions)
+            direction = rng.choice(directions)
             # Choose number of steps (always staying within the grid)
             if direction == 'North':
-                num_steps = randint(0, height - location[1] - 1)
+                num_steps = rng.randint(0, height - location[1] - 1)
                 location[1] = location[1] + num_steps
             elif direction == 'South':
-                num_steps = randint(0, location[1])
+                num_steps = rng.randint(0, location[1])
                 location[1] = location[1] - num_steps
             elif direction == 'East':
-                num_steps = randint(0, width - location[0] - 1)
+                num_steps = rng.randint(0, width - location[0] - 1)
                 location[0] = location[0] + num_steps
             else:
-                num_steps = randint(0, location[0])
+                num_steps = rng.randint(0, location[0])
                 location[0] = location[0] - num_steps
-            # Add the move to the data set
-            data_items.append([direction, num_steps])
-
-    # Print the whole data set to the shell window, nicely laid out
-    print('The data set to visualise is as follows:\n')
-    print(str(data_items).replace('],', '],\n'))
-    if len(data_items) == 1:
-        print('\nThere was one step only\n')
-    else:
-        print('\nThere were', len(data_items), 'steps in total\n')
+            # The move is the next data item
+            data_item = [direction, num_steps]
+        if log is not None:
+            log(data_item)
+        yield data_item
+
+# Create the whole data set as a list, printing it to the shell window
+# unless asked not to
+def raw_data(width = 1, height = 1, rng = None, verbose = True):
+
+    data_items = list(iter_raw_data(width, height, rng))
+
+    if verbose:
+        # Print the whole data set to the shell window, nicely laid out
+        print('The data set to visualise is as follows:\n')
+        print(str(data_items).replace('],', '],\n'))
+        if len(data_items) == 1:
+            print('\nThere was one step only\n')
+        else:
+            print('\nThere were', len(data_items), 'steps in total\n')
     # Return the data set to the caller
     return data_items
+
+
+
+#-----Bulk Data Set Function-------------#
+# Creates many random data sets at once using NumPy arrays, for when we
+# need huge numbers of journeys (e.g. for statistics) rather than one
+# to draw.  The journeys follow the same rules as raw_data, but are
+# stored column by column instead of as lists of lists:
+#   start_x, start_y, start_variant - one entry per journey (0-based)
+#   offsets - journey i's instructions are opcodes/values[offsets[i]:offsets[i + 1]]
+#   opcodes - index into batch_opcodes
+#   values - number of steps for moves, or variant index for changes
+#   variants - the variant codes the indexes refer to
+
+batch_opcodes = ['North', 'South', 'East', 'West', 'Change']
+
+class JourneyBatch:
+
+    def __init__(self, width, height, start_x, start_y, start_variant,
+                 offsets, opcodes, values, variants):
+        self.width = width
+        self.height = height
+        self.start_x = start_x
+        self.start_y = start_y
+        self.start_variant = start_variant
+        self.offsets = offsets
+        self.opcodes = opcodes
+        self.values = values
+        self.variants = variants
+
+    def __len__(self):
+        return len(self.start_x)
+
+    # Turn one journey back into the list form produced by raw_data
+    def journey(self, index):
+        data_items = [['Start', column_label(int(self.start_x[index])),
+                       int(self.start_y[index]) + 1,
+                       self.variants[self.start_variant[index]]]]
+        first, last = self.offsets[index], self.offsets[index + 1]
+        for opcode, value in zip(self.opcodes[first:last],
+                                 self.values[first:last]):
+            if batch_opcodes[opcode] == 'Change':
+                data_items.append(['Change', self.variants[value]])
+            else:
+                data_items.append([batch_opcodes[opcode], int(value)])
+        return data_items
+
+def raw_data_batch(n, width = 1, height = 1, rng = None):
+    import numpy as np
+
+    # Accept a NumPy generator, a seed, or nothing at all
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+
+    variants = variant_codes()
+    max_data = 100
+    mutation_probability = 20 # percent
+    num_data = rng.integers(0, max_data + 1, n)
+    x = rng.integers(0, width, n, np.int32)
+    y = rng.integers(0, height, n, np.int32)
+    start_x, start_y = x.copy(), y.copy()
+    variant = rng.integers(0, len(variants), n, np.int32)
+    start_variant = variant.copy()
+
+    # Filled in a step (row) at a time, one column per journey
+    opcodes = np.zeros((max_data, n), np.uint8)
+    values = np.zeros((max_data, n), np.uint16)
+
+    # Work through the journeys one step at a time, all of them at
+    # once, since how far a journey can move depends on where it is
+    for step in range(max_data):
+        # One batch of uniform numbers per step decides whether to
+        # mutate, which other variant to pick, which way to move and
+        # how far
+        draws = rng.random((4, n))
+        mutating = draws[0] * 100 < mutation_probability
+        # Any of the other variants is equally likely
+        changed = (variant + 1 + (draws[1] * (len(variants) - 1))
+                   .astype(np.int32)) % len(variants)
+        variant = np.where(mutating, changed, variant)
+
+        # Choose a direction and a number of steps that stays in the grid
+        direction = (draws[2] * 4).astype(np.int32)
+        vertical = direction < 2
+        forwards = (direction % 2) == 0 # North or East
+        position = np.where(vertical, y, x)
+        limit = np.where(vertical, height, width)
+        room = np.where(forwards, limit - 1 - position, position)
+        num_steps = (draws[3] * (room + 1)).astype(np.int32)
+        num_steps[mutating | (step >= num_data)] = 0
+        moved = position + np.where(forwards, num_steps, -num_steps)
+        y = np.where(vertical, moved, y)
+        x = np.where(vertical, x, moved)
+
+        opcodes[step] = np.where(mutating, len(batch_opcodes) - 1, direction)
+        values[step] = np.where(mutating, variant, num_steps)
+
+    # Keep only the steps each journey actually has, journey by journey
+    in_use = np.arange(max_data) < num_data[:, None]
+    offsets = np.zeros(n + 1, np.int64)
+    np.cumsum(num_data, out = offsets[1:])
+    return JourneyBatch(width, height, start_x, start_y, start_variant,
+                        offsets, opcodes.T[in_use], values.T[in_use], variants)
@@ -0,0 +1,202 @@
+from math import sin, cos, radians
+from arc_geometry import arc_segments, arc_points, default_tolerance
+
+#-----Recording Pen--------------------------------------------------#
+# A stand-in for the turtle that remembers what it would have drawn
+# instead of drawing it.  Every drawing function in contact_tracer4
+# only moves the turtle and fills shapes, so recording the polygons
+# and pen lines it produces once is enough to redraw the same picture
+# anywhere else later on.
+#
+# Display list items are plain lists so they are cheap to copy:
+#   ['polygon', fill_colour, points]
+#   ['line', pen_colour, pen_width, points]
+#
+# Pen widths are multiplied by width_scale, so a picture recorded at a
+# tenth of its usual size has lines a tenth as thick, and lines that
+# would come out thinner than min_line_width are left out altogether
+# (at small sizes they would only smudge the picture).
+
+min_line_width = 0.25 # pixels
+
+class RecordingPen:
+
+    def __init__(self, tolerance = default_tolerance, width_scale = 1):
+        self.items = []
+        self.tolerance = tolerance # how far arcs may stray, in pixels
+        self.width_scale = width_scale
+        self.position = (0.0, 0.0)
+        self.angle = 0.0 # degrees, east is 0 and turning left is positive
+        self.drawing = True
+        self.pen_colour = 'black'
+        self.fill_colour = 'black'
+        self.pen_width = 1
+        self.line = None # the pen line currently being extended
+        self.fill = None # the polygon currently being filled
+
+    # Finish the current pen line so the next move starts a new one
+    def new_line(self):
+        self.line = None
+
+    # Move the pen to a point, remembering the line and fill path
+    def move_to(self, x, y):
+        end = (x, y)
+        if self.drawing:
+            if self.line is None:
+                self.line = ['line', self.pen_colour,
+                             self.pen_width * self.width_scale,
+                             [self.position]]
+                self.items.append(self.line)
+            self.line[3].append(end)
+        if self.fill is not None:
+            self.fill[2].append(end)
+        self.position = end
+
+    # Turtle movement primitives
+    def goto(self, x, y = None):
+        if y is None:
+            x, y = x
+        self.move_to(x, y)
+
+    def forward(self, distance):
+        x, y = self.position
+        angle = radians(self.angle)
+        self.move_to(x + distance * cos(angle), y + distance * sin(angle))
+
+    def backward(self, distance):
+        self.forward(-distance)
+
+    def left(self, angle):
+        self.angle = (self.angle + angle) % 360
+
+    def right(self, angle):
+        self.left(-angle)
+
+    def setheading(self, angle):
+        self.angle = angle % 360
+
+    def heading(self):
+        return self.angle
+
+    def home(self):
+        self.goto(0, 0)
+        self.setheading(0)
+
+    def xcor(self):
+        return self.position[0]
+
+    def ycor(self):
+        return self.position[1]
+
+    # Arcs are split into as many chords as their size needs (see
+    # arc_geometry) rather than turtle's fixed-ish count, but end up
+    # exactly where turtle's circle would leave the pen
+    def circle(self, radius, extent = None, steps = None):
+        if extent is None:
+            extent = 360
+        if steps is None:
+            steps = arc_segments(radius, extent, self.tolerance)
+        x, y = self.position
+        for point_x, point_y in arc_points(x, y, self.angle, radius, extent,
+                                           steps):
+            self.move_to(point_x, point_y)
+        if radius < 0:
+            self.left(-extent)
+        else:
+            self.left(extent)
+
+    # Pen state primitives
+    def penup(self):
+        if self.drawing:
+            self.drawing = False
+            self.new_line()
+
+    def pendown(self):
+        if not self.drawing:
+            self.drawing = True
+            self.new_line()
+
+    def pencolor(self, colour):
+        self.pen_colour = colour
+        self.new_line()
+
+    def fillcolor(self, colour):
+        self.fill_colour = colour
+
+    def color(self, pen_colour, fill_colour = None):
+        self.pencolor(pen_colour)
+        self.fillcolor(pen_colour if fill_colour is None else fill_colour)
+
+    def width(self, pen_width):
+        self.pen_width = pen_width
+        self.new_line()
+
+    # Filling primitives, placing the polygon below any pen lines drawn
+    # while it is being filled just like turtle does
+    def begin_fill(self):
+        if self.fill is None:
+            self.fill = ['polygon', None, []]
+            self.items.append(self.fill)
+        self.fill[2] = [self.position]
+        self.new_line()
+
+    def end_fill(self):
+        if self.fill is not None:
+            self.fill[1] = self.fill_colour
+            self.fill = None
+        self.new_line()
+
+    # Hand back the finished display list, dropping shapes too small
+    # to appear on screen
+    def display_list(self):
+        finished = []
+        for item in self.items:
+            if item[0] == 'polygon' and (item[1] is None or len(item[2]) < 3):
+                continue
+            if item[0] == 'line' and (len(item[3]) < 2 or
+                                      item[2] < min_line_width):
+                continue
+            finished.append(item)
+        return finished
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Replaying Display Lists----------------------------------------#
+# Draw a recorded display list straight onto a Tk canvas, shifted so
+# its origin lands on (x, y) in turtle coordinates.  Turtle's canvas
+# has the y axis pointing down, hence the flip.  Text and dots (see
+# headless_turtle) are drawn the way turtle would draw them.
+text_anchors = {'left': 'sw', 'center': 's', 'right': 'se'}
+
+def draw_on_canvas(canvas, items, x = 0, y = 0, xscale = 1, yscale = 1):
+    for item in items:
+        if item[0] == 'text':
+            canvas.create_text((item[1] + x) * xscale - 1,
+                               -(item[2] + y) * yscale, text = item[3],
+                               anchor = text_anchors[item[4]],
+                               font = tuple(item[5]), fill = item[6])
+            continue
+        if item[0] == 'dot':
+            centre_x, centre_y = (item[1] + x) * xscale, -(item[2] + y) * yscale
+            radius = item[3] / 2
+            canvas.create_oval(centre_x - radius, centre_y - radius,
+                               centre_x + radius, centre_y + radius,
+                               fill = item[4], outline = '')
+            continue
+        if item[0] == 'polygon':
+            points = item[2]
+        else:
+            points = item[3]
+        coords = []
+        for point_x, point_y in points:
+            coords.append((point_x + x) * xscale)
+            coords.append(-(point_y + y) * yscale)
+        if item[0] == 'polygon':
+            canvas.create_polygon(coords, fill = item[1], outline = '')
+        else:
+            canvas.create_line(coords, fill = item[1], width = item[2],
+                               capstyle = 'round')
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,347 @@
+import argparse
+from os import makedirs
+from os.path import join
+
+import numpy as np
+
+import contact_tracer4
+from headless_turtle import HeadlessTurtle
+from png_raster import rgb, paint_items, rasterise_tile, encode_png
+
+#-----GIF Encoding---------------------------------------------------#
+# A minimal animated GIF writer.  Every frame only covers the part of
+# the canvas that changed and carries its own colour table, which is
+# small as the drawings use a handful of flat colours.
+
+# Variable length LZW as used by GIF, restarting the code table
+# whenever it fills up
+def lzw_compress(indices, min_code_size):
+    clear_code = 1 << min_code_size
+    end_code = clear_code + 1
+    output = bytearray()
+    bits = 0
+    bit_count = 0
+
+    def reset():
+        return {}, end_code + 1, min_code_size + 1
+
+    codes, next_code, code_size = reset()
+    pending = [(clear_code, code_size)]
+    prefix = None
+    for index in indices:
+        if prefix is None:
+            prefix = index
+            continue
+        key = (prefix << 8) | index
+        if key in codes:
+            prefix = codes[key]
+            continue
+        pending.append((prefix, code_size))
+        if next_code == 4096:
+            pending.append((clear_code, code_size))
+            codes, next_code, code_size = reset()
+        else:
+            codes[key] = next_code
+            next_code = next_code + 1
+            if next_code > (1 << code_size) and code_size < 12:
+                code_size = code_size + 1
+        prefix = index
+        # Pack the codes into bytes least significant bit first
+        for code, size in pending:
+            bits = bits | (code << bit_count)
+            bit_count = bit_count + size
+        pending = []
+        while bit_count >= 8:
+            output.append(bits & 0xff)
+            bits = bits >> 8
+            bit_count = bit_count - 8
+    if prefix is not None:
+        pending.append((prefix, code_size))
+    pending.append((end_code, code_size))
+    for code, size in pending:
+        bits = bits | (code << bit_count)
+        bit_count = bit_count + size
+    while bit_count > 0:
+        output.append(bits & 0xff)
+        bits = bits >> 8
+        bit_count = bit_count - 8
+    return bytes(output)
+
+# GIF data is split into blocks of at most 255 bytes
+def sub_blocks(data):
+    blocks = bytearray()
+    for start in range(0, len(data), 255):
+        block = data[start:start + 255]
+        blocks.append(len(block))
+        blocks.extend(block)
+    blocks.append(0)
+    return bytes(blocks)
+
+# A colour table and the colour number of every pixel.  Should a frame
+# ever hold more than 256 colours it falls back to 3-3-2 bit colour.
+def palette_indices(pixels):
+    packed = ((pixels[:, :, 0].astype(np.uint32) << 16) |
+              (pixels[:, :, 1].astype(np.uint32) << 8) | pixels[:, :, 2])
+    colours, indices = np.unique(packed, return_inverse = True)
+    if len(colours) > 256:
+        reduced = pixels & np.array([0xe0, 0xe0, 0xc0], np.uint8)
+        return palette_indices(reduced)
+    palette = np.stack([colours >> 16, (colours >> 8) & 0xff, colours & 0xff],
+                       axis = 1).astype(np.uint8)
+    return palette, indices.reshape(-1).astype(np.uint8)
+
+class GifSink:
+
+    def __init__(self, file_name, delay_ms = 200, loop = 0):
+        self.gif_file = open(file_name, 'wb')
+        self.delay = max(int(round(delay_ms / 10)), 1) # hundredths
+        self.loop = loop # 0 repeats forever
+        self.frames = 0
+
+    def frame(self, image, rect):
+        if self.frames == 0:
+            height, width = image.shape[:2]
+            # Logical screen without a global colour table, then the
+            # extension that makes the animation repeat
+            self.gif_file.write(b'GIF89a' + width.to_bytes(2, 'little') +
+                                height.to_bytes(2, 'little') + b'\x00\x00\x00')
+            self.gif_file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01' +
+                                self.loop.to_bytes(2, 'little') + b'\x00')
+        left, top, right, bottom = rect
+        palette, indices = palette_indices(image[top:bottom, left:right])
+        table_bits = max(int(len(palette) - 1).bit_length(), 1)
+        table = np.zeros((1 << table_bits, 3), np.uint8)
+        table[:len(palette)] = palette
+        # Leave each frame in place so the next one only adds to it
+        self.gif_file.write(b'\x21\xf9\x04\x04' +
+                            self.delay.to_bytes(2, 'little') + b'\x00\x00')
+        self.gif_file.write(b'\x2c' + b''.join(
+            value.to_bytes(2, 'little')
+            for value in (left, top, right - left, bottom - top)))
+        self.gif_file.write(bytes([0x80 | (table_bits - 1)]) + table.tobytes())
+        min_code_size = max(table_bits, 2)
+        self.gif_file.write(bytes([min_code_size]))
+        self.gif_file.write(sub_blocks(lzw_compress(indices.tolist(),
+                                                    min_code_size)))
+        self.frames = self.frames + 1
+
+    def close(self):
+        self.gif_file.write(b'\x3b')
+        self.gif_file.close()
+
+#--------------------------------------------------------------------#
+
+
+
+#-----PNG Sequences--------------------------------------------------#
+# Numbered PNG files, one per frame.  Each file has to be a picture in
+# its own right, so these hold the whole canvas, but they are written
+# straight from the one canvas the recorder keeps.
+
+class PngSequenceSink:
+
+    def __init__(self, output_dir, prefix = 'frame'):
+        makedirs(output_dir, exist_ok = True)
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.frames = 0
+
+    def frame(self, image, rect):
+        file_name = join(self.output_dir,
+                         '{}_{:05}.png'.format(self.prefix, self.frames))
+        with open(file_name, 'wb') as png_file:
+            png_file.write(encode_png(image))
+        self.frames = self.frames + 1
+
+    def close(self):
+        pass
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Frame Recorder-------------------------------------------------#
+# Takes the place of visualise's refresh policy (see refresh_policy)
+# on a headless backend.  Whenever a frame is due, only the items drawn
+# since the last frame are painted onto a single canvas, and the sink
+# is handed the canvas with the rectangle those items cover, so no
+# frame is ever redrawn from scratch.  Painted items are then dropped
+# from the backend's display list, so nothing grows with the length of
+# the journey (unless the sink keeps its frames).
+#
+# Every tile gets its own frame, unless the journey is passed through
+# instructions(), in which case each instruction gets one frame.
+
+class FrameRecorder:
+
+    def __init__(self, backend, sink, scale = 1):
+        self.backend = backend
+        self.sink = sink
+        self.scale = scale
+        self.per_instruction = False
+        self.canvas = None
+
+    def start(self, update):
+        self.update = update
+        width, height = self.backend.window_size
+        self.canvas = np.empty((int(round(height * self.scale)),
+                                int(round(width * self.scale)), 3), np.uint8)
+        self.canvas[:, :] = rgb(self.backend.background)
+        self.tiles = {} # rasterised tiles, by name
+        self.tiles_waiting = 0
+        # The first frame shows everything drawn before the journey
+        self.capture()
+
+    # Pass a journey's instructions on one at a time, ending a frame
+    # before each new one is taken.  visualise only takes the next
+    # instruction once every paint of the last one is drawn, so each
+    # frame shows exactly one instruction.
+    def instructions(self, data):
+        self.per_instruction = True
+        for instruction in data:
+            if self.tiles_waiting > 0:
+                self.capture()
+            yield instruction
+
+    def tile_drawn(self):
+        self.tiles_waiting = self.tiles_waiting + 1
+        if not self.per_instruction:
+            self.capture()
+
+    def finish(self):
+        if self.tiles_waiting > 0:
+            self.capture()
+
+    # Show whatever was drawn after the journey (the final variant) and
+    # finish the file
+    def close(self):
+        if self.canvas is not None:
+            self.capture()
+        self.sink.close()
+
+    # Pixel rectangle covered by the given items, or None
+    def bounds(self, items):
+        height, width = self.canvas.shape[:2]
+        origin_x, origin_y = width / 2, height / 2
+        left, top, right, bottom = width, height, 0, 0
+        for item in items:
+            if item[0] == 'tile':
+                patch, tile_x, tile_y = self.tiles[item[1]]
+                x = int(round(origin_x + item[2] * self.scale)) - tile_x
+                y = int(round(origin_y - item[3] * self.scale)) - tile_y
+                extent = (x, y, x + patch.shape[1], y + patch.shape[0])
+            else:
+                if item[0] == 'polygon':
+                    points, margin = item[2], 2
+                elif item[0] == 'line':
+                    points, margin = item[3], item[2] + 2
+                elif item[0] == 'dot':
+                    points, margin = [item[1:3]], item[3] / 2 + 2
+                else:
+                    continue # text isn't painted
+                points = np.array(points, float) * self.scale
+                margin = margin * self.scale
+                extent = (int(origin_x + points[:, 0].min() - margin),
+                          int(origin_y - points[:, 1].max() - margin),
+                          int(origin_x + points[:, 0].max() + margin) + 1,
+                          int(origin_y - points[:, 1].min() + margin) + 1)
+            left, top = min(left, extent[0]), min(top, extent[1])
+            right, bottom = max(right, extent[2]), max(bottom, extent[3])
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right, width), min(bottom, height)
+        if left >= right or top >= bottom:
+            return None
+        return left, top, right, bottom
+
+    def capture(self):
+        self.update()
+        # Make sure the last pen line is not extended after it is painted
+        self.backend.new_line()
+        # A shape still being filled (and anything drawn over it) has to
+        # wait for a later frame
+        items = self.backend.items
+        finished = len(items)
+        for position, item in enumerate(items):
+            if item is self.backend.fill:
+                finished = position
+                break
+        new_items = []
+        for item in items[:finished]:
+            if item[0] == 'polygon' and (item[1] is None or len(item[2]) < 3):
+                continue
+            if item[0] == 'line' and len(item[3]) < 2:
+                continue
+            if item[0] == 'tile' and item[1] not in self.tiles:
+                self.tiles[item[1]] = rasterise_tile(
+                    self.backend.tiles[item[1]], self.scale)
+            new_items.append(item)
+        # Once on the canvas the items aren't needed any more
+        del items[:finished]
+        self.tiles_waiting = 0
+
+        height, width = self.canvas.shape[:2]
+        if self.sink.frames == 0:
+            rect = (0, 0, width, height)
+        else:
+            rect = self.bounds(new_items)
+        paint_items(self.canvas, new_items, width / 2, height / 2,
+                    self.scale, self.tiles)
+        if rect is not None:
+            self.sink.frame(self.canvas, rect)
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Exporting Journeys---------------------------------------------#
+
+# Draw a journey headlessly, sending frames to the sink as it goes.
+# Every paint is drawn (not just the ones still visible at the end) so
+# the animation shows the whole journey.
+def export_frames(data, sink, decoration_seed = None, per_instruction = True,
+                  scale = 1):
+    backend = HeadlessTurtle()
+    recorder = FrameRecorder(backend, sink, scale)
+    if per_instruction:
+        data = recorder.instructions(data)
+    def draw():
+        contact_tracer4.create_drawing_canvas(label_spaces = False)
+        contact_tracer4.title("A birds adventure")
+        contact_tracer4.visualise(data, decoration_seed,
+                                  skip_overwritten = False,
+                                  refresh = recorder)
+    contact_tracer4.render_with(draw, backend)
+    recorder.close()
+    return sink.frames
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Command Line---------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Animate a journey as a GIF or numbered PNG frames.')
+    parser.add_argument('seed', type = int)
+    parser.add_argument('--output', default = 'journey.gif',
+                        help = 'GIF file, or a folder for --format png')
+    parser.add_argument('--format', choices = ['gif', 'png'], default = 'gif')
+    parser.add_argument('--per', choices = ['instruction', 'tile'],
+                        default = 'instruction',
+                        help = 'what each frame adds to the picture')
+    parser.add_argument('--delay', type = int, default = 200,
+                        help = 'milliseconds per GIF frame')
+    parser.add_argument('--scale', type = float, default = 1)
+    args = parser.parse_args()
+
+    if args.format == 'png':
+        sink = PngSequenceSink(args.output)
+    else:
+        sink = GifSink(args.output, args.delay)
+    data = contact_tracer4.data_set(args.seed, verbose = False)
+    frames = export_frames(data, sink, args.seed, args.per == 'instruction',
+                           args.scale)
+    print('Wrote', frames, 'frames to', args.output)
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,31 @@
+#-----Column Labels--------------------------------------------------#
+# Grid columns are labelled the way spreadsheet columns are: a to z,
+# then aa, ab, ... az, ba and so on, so a grid can be any width.  The
+# labels are numbers in base 26 with digits a (1) to z (26) and no
+# zero, which makes converting either way a few arithmetic steps per
+# letter (three letters already cover 18278 columns) instead of a
+# search through a list of labels.  Column numbers count from 0.
+
+def is_column_label(label):
+    return (isinstance(label, str) and label.isascii() and
+            label.isalpha() and label.islower())
+
+def column_label(column):
+    if column < 0:
+        raise ValueError('Columns are numbered from 0')
+    label = ''
+    column = column + 1
+    while column > 0:
+        column, digit = divmod(column - 1, 26)
+        label = chr(ord('a') + digit) + label
+    return label
+
+def column_number(label):
+    if not is_column_label(label):
+        raise ValueError('Not a column label: ' + repr(label))
+    column = 0
+    for letter in label:
+        column = column * 26 + ord(letter) - ord('a') + 1
+    return column - 1
+
+#--------------------------------------------------------------------#
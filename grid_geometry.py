@@ -0,0 +1,97 @@
+from variant_registry import registry
+
+#-----Grid Geometry--------------------------------------------------#
+# Where everything goes on the canvas for a grid of any number of
+# cells of any size.  With the default settings this is exactly the
+# original 9x7 layout of 100 pixel cells.
+#
+# The key and the final variant panel are drawn at panel_size, which
+# doesn't shrink with the cells (so a 256x256 grid of 4 pixel cells
+# still has a readable key), and the window is made tall enough for
+# the key however few rows the grid has.  Cells are (column, row)
+# pairs counting from 0 at the bottom left, as in journey_compiler.
+#
+# Unless told how many entries the key has, the key has one for every
+# variant registered at the time it is drawn (see variant_registry), so
+# variants registered after the geometry was made still fit.
+
+class GridGeometry:
+
+    def __init__(self, cell_size = 100, grid_width = 9, grid_height = 7,
+                 panel_size = None, key_entries = None):
+        self.cell_size = cell_size # pixels
+        self.grid_width = grid_width # squares
+        self.grid_height = grid_height # squares
+        if panel_size is None:
+            panel_size = max(cell_size, 100)
+        self.panel_size = panel_size # pixels
+        self.fixed_key_entries = key_entries # or None to follow the registry
+
+        # Margins left/right and below/above the grid
+        self.x_margin = panel_size * 2.75
+        self.y_margin = panel_size // 2
+        self.window_width = grid_width * cell_size + self.x_margin * 2
+
+        # The grid is centred on turtle's (0, 0)
+        self.left_edge = -(grid_width * cell_size) // 2
+        self.bottom_edge = -(grid_height * cell_size) // 2
+        self.right_edge = self.left_edge + grid_width * cell_size
+        self.top_edge = self.bottom_edge + grid_height * cell_size
+
+        # Final variant on the left (the key goes on the right)
+        self.final_position = (self.left_edge - panel_size * 3 // 2,
+                               -(panel_size // 2))
+        self.key_step = panel_size * 5 // 4 # from one image to the next
+        self.key_gap = panel_size // 4 # from an image to its label
+
+        self.small_font = ('Arial', cell_size // 5, 'normal') # coords
+        self.big_font = ('Arial', panel_size // 4, 'normal') # other text
+        # Labels that would come out smaller than this are left off
+        self.labelled = cell_size // 5 >= 4
+        self.line_width = 2 if cell_size >= 20 else 1
+
+    # Variants shown in the key
+    @property
+    def key_entries(self):
+        if self.fixed_key_entries is None:
+            return len(registry)
+        return self.fixed_key_entries
+
+    # The key is a title and an image for each variant with a label
+    # under it, spaced one and a half panels apart
+    @property
+    def content_height(self):
+        return max(self.grid_height * self.cell_size,
+                   self.panel_size + self.panel_size * 3 * self.key_entries // 2)
+
+    @property
+    def window_height(self):
+        return self.content_height + self.y_margin * 2
+
+    @property
+    def key_position(self):
+        return (self.right_edge + self.panel_size // 2,
+                self.content_height // 2 - self.panel_size // 2)
+
+    # Bottom left corner of a cell
+    def cell_origin(self, column, row):
+        return (self.left_edge + column * self.cell_size,
+                self.bottom_edge + row * self.cell_size)
+
+    def contains(self, column, row):
+        return 0 <= column < self.grid_width and 0 <= row < self.grid_height
+
+    # The cell a point lies in, or None if it is off the grid
+    def cell_at(self, x, y):
+        column = int((x - self.left_edge) // self.cell_size)
+        row = int((y - self.bottom_edge) // self.cell_size)
+        if self.contains(column, row):
+            return column, row
+        return None
+
+    # Everything that decides the layout, e.g. for cache keys
+    def settings(self):
+        return [self.cell_size, self.grid_width, self.grid_height,
+                self.panel_size, self.key_entries]
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,78 @@
+from display_list import RecordingPen
+
+#-----Headless Drawing Backend---------------------------------------#
+# A drop-in replacement for the turtle functions used by
+# contact_tracer4 that needs no Tk display.  Everything drawn ends up
+# in an in-memory scene which can then be written out by one of the
+# exporters, so whole journeys can be rendered in batch jobs.
+#
+# On top of the display list items recorded by the pen, the scene
+# holds:
+#   ['text', x, y, text, align, font, colour]
+#   ['dot', x, y, size, colour]
+#   ['tile', name, x, y] (see the tiles dictionary for its items)
+
+class HeadlessTurtle(RecordingPen):
+
+    def __init__(self):
+        RecordingPen.__init__(self)
+        self.window_size = (0, 0)
+        self.background = 'white'
+        self.window_title = ''
+        self.tiles = {} # recorded tiles placed in the scene, by name
+
+    # Screen primitives
+    def setup(self, width, height):
+        self.window_size = (width, height)
+
+    def bgcolor(self, colour):
+        self.background = colour
+
+    def title(self, text):
+        self.window_title = text
+
+    # There is nothing to show, so these do nothing
+    def tracer(self, flag = None, delay = None):
+        pass
+
+    def update(self):
+        pass
+
+    def speed(self, speed = None):
+        pass
+
+    def hideturtle(self):
+        pass
+
+    def done(self):
+        pass
+
+    # Drawing primitives beyond those of the recording pen
+    def write(self, text, move = False, align = 'left',
+              font = ('Arial', 8, 'normal')):
+        x, y = self.position
+        self.items.append(['text', x, y, str(text), align, font,
+                           self.pen_colour])
+
+    def dot(self, size = None, colour = None):
+        if size is None:
+            size = self.pen_width + max(self.pen_width, 4)
+        if colour is None:
+            colour = self.pen_colour
+        x, y = self.position
+        self.items.append(['dot', x, y, size, colour])
+
+    def place_tile(self, name, items):
+        self.tiles[name] = items
+        x, y = self.position
+        self.items.append(['tile', name, x, y])
+
+    # Add items recorded elsewhere (e.g. a cached background) as they are
+    def draw_items(self, items):
+        self.items.extend(items)
+
+    # Hand back everything drawn so far
+    def scene(self):
+        return self.display_list()
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,62 @@
+from grid_coordinates import column_number
+
+#-----Journey Compiler-----------------------------------------------#
+# Turns a journey's instructions into the tiles that have to be drawn.
+# Following the instructions paints one (cell, variant) pair at a time:
+#   Start - paints the starting cell with the starting variant
+#   Change - paints the current cell with the new variant
+#   a move of 0 steps - paints the current cell again
+#   a move of n steps - paints the current cell then moves one cell,
+#                       n times over (so the cell it ends on isn't
+#                       painted until a later instruction)
+# Cells are (column, row) pairs counting from 0 at the bottom left.
+
+# Direction of travel for each move, in cells
+moves = {'North': (0, 1), 'South': (0, -1), 'East': (1, 0), 'West': (-1, 0)}
+
+# The paints one instruction makes starting from the given cell and
+# variant, and the cell and variant the journey is left at
+def follow_instruction(instruction, cell, variant):
+    paints = []
+    if instruction[0] == 'Start':
+        cell = (column_number(instruction[1]), instruction[2] - 1)
+        variant = instruction[3]
+        paints.append((cell, variant))
+    elif instruction[0] == 'Change':
+        variant = instruction[1]
+        paints.append((cell, variant))
+    elif instruction[1] == 0:
+        paints.append((cell, variant))
+    else:
+        column_step, row_step = moves[instruction[0]]
+        for step in range(instruction[1]):
+            paints.append((cell, variant))
+            cell = (cell[0] + column_step, cell[1] + row_step)
+    return paints, cell, variant
+
+# Every paint in the order the instructions produce it, as (cell,
+# variant, instruction number) so each paint can be traced back to the
+# journey step that made it
+def paint_operations(data):
+    cell = None
+    variant = ''
+    for number, instruction in enumerate(data):
+        paints, cell, variant = follow_instruction(instruction, cell, variant)
+        for paint_cell, paint_variant in paints:
+            yield paint_cell, paint_variant, number
+
+# Only the paints that are still visible at the end, in their original
+# order, so a long journey that keeps revisiting cells costs one tile
+# per distinct cell.  The last paint always survives, so its variant
+# is still the journey's final variant.
+def compile_journey(data):
+    # Dictionaries keep insertion order, so removing a cell before
+    # painting it again keeps them ordered by their last paint
+    last_paint = {}
+    for cell, variant, number in paint_operations(data):
+        last_paint.pop(cell, None)
+        last_paint[cell] = (variant, number)
+    return [(cell, variant, number)
+            for cell, (variant, number) in last_paint.items()]
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,159 @@
+import mmap
+import struct
+
+from grid_coordinates import column_label, column_number
+
+#-----Packed Journey Format------------------------------------------#
+# Journeys stored as lists like ['North', 3] cost around a hundred
+# bytes per instruction, so they are packed into two-byte records for
+# storage instead:
+#   byte 0 - opcode in the top 3 bits, variant index in the bottom 5
+#   byte 1 - number of steps, or a (0-based) grid coordinate
+# A 'Start' instruction takes two records, the second one (opcode
+# 'Row') holding the row.
+#
+# A file holds many journeys:
+#   header - magic, grid width, grid height, journey count and the
+#            position of the offset table
+#   records - every journey's records, one journey after another
+#   offset table - journey count + 1 record numbers marking where each
+#                  journey starts (and the last one ends)
+
+magic = b'BJ01'
+header_format = '<4sHHQQ'
+header_size = struct.calcsize(header_format)
+
+opcodes = ['Start', 'Row', 'North', 'South', 'East', 'West', 'Change']
+variants = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Largest step count or grid coordinate a record can hold
+max_value = 255
+
+def record(opcode, variant_index = 0, value = 0):
+    if not 0 <= value <= max_value:
+        raise ValueError('{} value {} does not fit in a record (0 to {})'
+                         .format(opcode, value, max_value))
+    return bytes([(opcodes.index(opcode) << 5) | variant_index, value])
+
+# Pack one journey in the raw_data list form into bytes
+def pack_journey(data):
+    packed = bytearray()
+    for instruction in data:
+        if instruction[0] == 'Start':
+            packed += record('Start', variants.index(instruction[3]),
+                             column_number(instruction[1]))
+            packed += record('Row', 0, instruction[2] - 1)
+        elif instruction[0] == 'Change':
+            packed += record('Change', variants.index(instruction[1]))
+        else:
+            packed += record(instruction[0], 0, instruction[1])
+    return bytes(packed)
+
+# Unpack journey records (those between the first and last byte
+# positions given) back into instructions, one at a time
+def unpack_records(records, first = 0, last = None):
+    if last is None:
+        last = len(records)
+    for position in range(first, last, 2):
+        opcode = opcodes[records[position] >> 5]
+        variant = variants[records[position] & 0x1f]
+        value = records[position + 1]
+        if opcode == 'Start':
+            column, variant_code = column_label(value), variant
+        elif opcode == 'Row':
+            yield ['Start', column, value + 1, variant_code]
+        elif opcode == 'Change':
+            yield ['Change', variant]
+        else:
+            yield [opcode, value]
+
+# Write many journeys to a file, streaming them so the journeys don't
+# all have to be in memory at once
+def write_journeys(file_name, journeys, width, height):
+    with open(file_name, 'wb') as journey_file:
+        journey_file.write(bytes(header_size))
+        record_numbers = [0]
+        for data in journeys:
+            packed = pack_journey(data)
+            journey_file.write(packed)
+            record_numbers.append(record_numbers[-1] + len(packed) // 2)
+        # Keep the offset table 8-byte aligned
+        table_position = journey_file.tell()
+        padding = -table_position % 8
+        journey_file.write(bytes(padding))
+        table_position = table_position + padding
+        journey_file.write(struct.pack('<{}Q'.format(len(record_numbers)),
+                                       *record_numbers))
+        journey_file.seek(0)
+        journey_file.write(struct.pack(header_format, magic, width, height,
+                                       len(record_numbers) - 1,
+                                       table_position))
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Reading Packed Journeys----------------------------------------#
+
+# One journey inside a mapped file.  It only holds where the journey's
+# records are and decodes instructions straight from the map as they
+# are iterated over, so it can be handed straight to visualise.  It
+# doesn't keep a view of the map either, so the file can still be
+# closed while views are around (they just can't be read after that).
+class JourneyView:
+
+    def __init__(self, journey_file, first, last):
+        self.journey_file = journey_file
+        self.first = first # byte positions of the journey's records
+        self.last = last
+
+    def __iter__(self):
+        return unpack_records(self.journey_file.map, self.first, self.last)
+
+    # Number of instructions (the Start takes two records)
+    def __len__(self):
+        return max((self.last - self.first) // 2 - 1, 0)
+
+# A memory-mapped file of packed journeys
+class JourneyFile:
+
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as journey_file:
+            self.map = mmap.mmap(journey_file.fileno(), 0,
+                                 access = mmap.ACCESS_READ)
+        (file_magic, self.width, self.height, count,
+         table_position) = struct.unpack_from(header_format, self.map)
+        if file_magic != magic:
+            self.close()
+            raise ValueError(file_name + ' is not a packed journey file')
+        self.offsets = memoryview(self.map)[
+            table_position:table_position + (count + 1) * 8].cast('Q')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index = index + len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('journey index out of range')
+        first = header_size + self.offsets[index] * 2
+        last = header_size + self.offsets[index + 1] * 2
+        return JourneyView(self, first, last)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        if hasattr(self, 'offsets'):
+            self.offsets.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+#--------------------------------------------------------------------#
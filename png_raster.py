@@ -0,0 +1,212 @@
+import zlib
+import struct
+import numpy as np
+
+from colours import rgb
+
+#-----Scanline Filling-----------------------------------------------#
+# Shapes are filled a whole block of scanlines at a time: for every
+# pixel row the crossing points with each edge are worked out at once,
+# sorted, and paired into spans using the even-odd rule.  The spans are
+# turned into a mask by marking where each one starts and stops and
+# taking a running sum along the row.
+
+# Mark the given spans in a mask covering rows top..bottom
+def spans_to_mask(rows, starts, ends, row_count, width):
+    valid = np.isfinite(starts) & np.isfinite(ends)
+    first_col = np.clip(np.ceil(starts[valid] - 0.5), 0, width).astype(int)
+    last_col = np.clip(np.ceil(ends[valid] - 0.5), 0, width).astype(int)
+    span_rows = rows[valid]
+    changes = np.zeros((row_count, width + 1), np.int32)
+    np.add.at(changes, (span_rows, first_col), 1)
+    np.add.at(changes, (span_rows, last_col), -1)
+    return np.cumsum(changes, axis = 1)[:, :width] > 0
+
+# The rows a shape covers, clipped to the image
+def row_range(y_values, height):
+    top = max(int(np.floor(y_values.min())), 0)
+    bottom = min(int(np.ceil(y_values.max())), height)
+    return top, bottom
+
+# Where the edges (x0, y0)-(x1, y1) cross each pixel row centre, or
+# infinity if they don't
+def crossings(row_centres, x0, y0, x1, y1):
+    crosses = (y0 <= row_centres) != (y1 <= row_centres)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        x_values = x0 + (row_centres - y0) * (x1 - x0) / (y1 - y0)
+    return np.where(crosses, x_values, np.inf)
+
+# Even-odd fill of a single (possibly self-intersecting) polygon given
+# in pixel coordinates.  Returns the first row covered and the mask.
+def polygon_mask(points, height, width):
+    points = np.asarray(points, float)
+    top, bottom = row_range(points[:, 1], height)
+    if top >= bottom:
+        return top, None
+    x0, y0 = points[:, 0], points[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    row_centres = (np.arange(top, bottom) + 0.5)[:, None]
+    x_values = np.sort(crossings(row_centres, x0, y0, x1, y1), axis = 1)
+    # An even-odd polygon has an even number of crossings on each row
+    pair_count = x_values.shape[1] // 2
+    starts = x_values[:, 0:pair_count * 2:2]
+    ends = x_values[:, 1:pair_count * 2:2]
+    rows = np.broadcast_to(np.arange(bottom - top)[:, None], starts.shape)
+    return top, spans_to_mask(rows, starts, ends, bottom - top, width)
+
+# Pen lines are drawn as one rectangle per segment, stretched by half
+# the pen width at each end so the corners join up.  Each rectangle is
+# convex, so it crosses a row at most twice.
+def stroke_mask(points, pen_width, height, width):
+    points = np.asarray(points, float)
+    start, end = points[:-1], points[1:]
+    direction = end - start
+    length = np.hypot(direction[:, 0], direction[:, 1])
+    direction[length == 0] = (1, 0)
+    length[length == 0] = 1
+    along = direction / length[:, None] * (max(pen_width, 1) / 2)
+    across = np.stack([-along[:, 1], along[:, 0]], axis = 1)
+    corners = np.stack([start - along + across, end + along + across,
+                        end + along - across, start - along - across],
+                       axis = 1)
+    top, bottom = row_range(corners[:, :, 1], height)
+    if top >= bottom:
+        return top, None
+    x0, y0 = corners[:, :, 0], corners[:, :, 1]
+    x1, y1 = np.roll(x0, -1, axis = 1), np.roll(y0, -1, axis = 1)
+    row_centres = (np.arange(top, bottom) + 0.5)[:, None, None]
+    x_values = np.sort(crossings(row_centres, x0, y0, x1, y1), axis = 2)
+    rows = np.broadcast_to(np.arange(bottom - top)[:, None],
+                           x_values.shape[:2])
+    return top, spans_to_mask(rows, x_values[:, :, 0], x_values[:, :, 1],
+                              bottom - top, width)
+
+def dot_mask(centre_x, centre_y, diameter, height, width):
+    radius = diameter / 2
+    top, bottom = row_range(np.array([centre_y - radius, centre_y + radius]),
+                            height)
+    if top >= bottom:
+        return top, None
+    row_centres = (np.arange(top, bottom) + 0.5)[:, None]
+    col_centres = np.arange(width) + 0.5
+    inside = ((row_centres - centre_y) ** 2 + (col_centres - centre_x) ** 2
+              <= radius ** 2)
+    return top, inside
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Rasterising Scenes---------------------------------------------#
+# Scene points are in turtle coordinates, so they are scaled and moved
+# so that (origin_x, origin_y) is where turtle's (0, 0) lands in the
+# image, with y flipped to point down the rows.
+
+def to_pixels(points, origin_x, origin_y, scale):
+    return [(origin_x + x * scale, origin_y - y * scale) for x, y in points]
+
+def paint(image, top, mask, colour):
+    if mask is not None:
+        image[top:top + mask.shape[0]][mask] = colour
+
+# Paint display list items onto an RGB or RGBA image.  Text is skipped
+# as there is no font renderer to hand.
+def paint_items(image, items, origin_x, origin_y, scale, tiles = None):
+    height, width = image.shape[:2]
+    opaque = (255,) if image.shape[2] == 4 else ()
+    for item in items:
+        if item[0] == 'polygon':
+            top, mask = polygon_mask(
+                to_pixels(item[2], origin_x, origin_y, scale), height, width)
+            paint(image, top, mask, rgb(item[1]) + opaque)
+        elif item[0] == 'line':
+            top, mask = stroke_mask(
+                to_pixels(item[3], origin_x, origin_y, scale),
+                item[2] * scale, height, width)
+            paint(image, top, mask, rgb(item[1]) + opaque)
+        elif item[0] == 'dot':
+            (x, y), = to_pixels([item[1:3]], origin_x, origin_y, scale)
+            top, mask = dot_mask(x, y, item[3] * scale, height, width)
+            paint(image, top, mask, rgb(item[4]) + opaque)
+        elif item[0] == 'tile':
+            (x, y), = to_pixels([item[2:4]], origin_x, origin_y, scale)
+            blit(image, tiles[item[1]], int(round(x)), int(round(y)))
+
+# Rasterise a tile once into an RGBA patch.  The patch covers every
+# point of the tile plus a pixel or two for pen lines, and remembers
+# where the tile origin sits inside it.
+def rasterise_tile(items, scale = 1):
+    points = []
+    for item in items:
+        points.extend(item[2] if item[0] == 'polygon' else item[3])
+    points = np.array(points, float) * scale
+    margin = 2
+    left = int(np.floor(points[:, 0].min())) - margin
+    right = int(np.ceil(points[:, 0].max())) + margin
+    bottom = int(np.floor(points[:, 1].min())) - margin
+    top = int(np.ceil(points[:, 1].max())) + margin
+    patch = np.zeros((top - bottom, right - left, 4), np.uint8)
+    paint_items(patch, items, -left, top, scale)
+    return patch, -left, top
+
+# Copy a pre-rasterised tile into the image with its origin at pixel
+# (x, y), using array slices rather than filling its shapes again
+def blit(image, tile, x, y):
+    patch, origin_x, origin_y = tile
+    height, width = image.shape[:2]
+    left, top = x - origin_x, y - origin_y
+    clip_left, clip_top = max(left, 0), max(top, 0)
+    clip_right = min(left + patch.shape[1], width)
+    clip_bottom = min(top + patch.shape[0], height)
+    if clip_left >= clip_right or clip_top >= clip_bottom:
+        return
+    source = patch[clip_top - top:clip_bottom - top,
+                   clip_left - left:clip_right - left]
+    target = image[clip_top:clip_bottom, clip_left:clip_right]
+    covered = source[:, :, 3] > 0
+    target[covered] = source[:, :, :image.shape[2]][covered]
+
+# Rasterise a headless backend's whole scene into an RGB array,
+# optionally scaled down for thumbnails.  Tiles already rasterised at
+# the same scale (e.g. from a tile_atlas) can be passed in by name.
+def rasterise_scene(backend, scale = 1, tiles = None):
+    window_width, window_height = backend.window_size
+    width = int(round(window_width * scale))
+    height = int(round(window_height * scale))
+    image = np.empty((height, width, 3), np.uint8)
+    image[:, :] = rgb(backend.background)
+    tiles = dict(tiles or {})
+    for name, items in backend.tiles.items():
+        if name not in tiles:
+            tiles[name] = rasterise_tile(items, scale)
+    paint_items(image, backend.scene(), width / 2, height / 2, scale, tiles)
+    return image
+
+#--------------------------------------------------------------------#
+
+
+
+#-----PNG Encoding---------------------------------------------------#
+# A minimal PNG writer: 8-bit RGB or RGBA, no filtering, zlib deflate.
+
+def png_chunk(chunk_type, data):
+    body = chunk_type + data
+    return (struct.pack('>I', len(data)) + body +
+            struct.pack('>I', zlib.crc32(body) & 0xffffffff))
+
+def encode_png(image, compression = 6):
+    height, width, channels = image.shape
+    colour_type = 6 if channels == 4 else 2
+    header = struct.pack('>IIBBBBB', width, height, 8, colour_type, 0, 0, 0)
+    # Each row starts with filter type 0 (none)
+    rows = np.zeros((height, width * channels + 1), np.uint8)
+    rows[:, 1:] = image.reshape(height, width * channels)
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header) +
+            png_chunk(b'IDAT', zlib.compress(rows.tobytes(), compression)) +
+            png_chunk(b'IEND', b''))
+
+def write_png(backend, file_name, scale = 1, tiles = None):
+    with open(file_name, 'wb') as png_file:
+        png_file.write(encode_png(rasterise_scene(backend, scale, tiles)))
+
+#--------------------------------------------------------------------#
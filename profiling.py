@@ -0,0 +1,146 @@
+import sys
+import argparse
+from time import perf_counter
+from contextlib import contextmanager
+
+import contact_tracer4
+from display_list import RecordingPen
+from headless_turtle import HeadlessTurtle
+
+#-----Primitive Profiler---------------------------------------------#
+# Counts and times calls to the turtle primitives and charges each one
+# to the chain of contact_tracer4 functions that led to it (and to the
+# journey step, i.e. the index of the instruction in the journey,
+# visualise was drawing at the time), e.g.
+#   visualise;step 4;draw_image;stamp_tile;record_tile;ocean_trip;rain_drop;circle
+# The totals are written out in the "collapsed stack" format that
+# flame graph tools read: one stack per line followed by its value.
+
+instrumented_primitives = ['forward', 'backward', 'circle', 'goto',
+                           'begin_fill', 'end_fill', 'fillcolor', 'update',
+                           'write', 'place_tile']
+
+traced_file = contact_tracer4.__file__
+
+# Any drawing backend with its primitives wrapped for the profiler.
+# Everything else is passed straight through to the backend.
+class InstrumentedBackend:
+
+    def __init__(self, backend, profiler):
+        self.backend = backend
+        for name in instrumented_primitives:
+            if hasattr(backend, name):
+                setattr(self, name, profiler.timed(name, getattr(backend, name)))
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+class PrimitiveProfiler:
+
+    def __init__(self):
+        self.calls = {}
+        self.seconds = {}
+
+    # The contact_tracer4 functions on the call stack, outermost first
+    def call_stack(self, frame):
+        names = []
+        while frame is not None:
+            if frame.f_code.co_filename == traced_file:
+                if frame.f_code.co_name == 'visualise' \
+                   and frame.f_locals.get('step') is not None:
+                    names.append('step {}'.format(frame.f_locals['step']))
+                names.append(frame.f_code.co_name)
+            frame = frame.f_back
+        names.reverse()
+        return tuple(names)
+
+    def timed(self, name, primitive):
+        def timed_primitive(*args, **kwargs):
+            stack = self.call_stack(sys._getframe(1)) + (name,)
+            start = perf_counter()
+            try:
+                return primitive(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.calls[stack] = self.calls.get(stack, 0) + 1
+                self.seconds[stack] = self.seconds.get(stack, 0) + elapsed
+        timed_primitive.__name__ = name
+        return timed_primitive
+
+    def wrap(self, backend):
+        return InstrumentedBackend(backend, self)
+
+    # While installed, tiles are recorded with an instrumented pen too
+    @contextmanager
+    def installed(self):
+        saved = contact_tracer4.tile_pen
+        contact_tracer4.tile_pen = lambda width_scale: self.wrap(
+            RecordingPen(width_scale = width_scale))
+        try:
+            yield self
+        finally:
+            contact_tracer4.tile_pen = saved
+
+    # Totals for each function that called a primitive directly (the
+    # journey steps in the stacks aren't functions, so are passed over)
+    def by_function(self):
+        totals = {}
+        for stack, calls in self.calls.items():
+            callers = [name for name in stack[:-1]
+                       if not name.startswith('step ')]
+            function = callers[-1] if callers else '(top level)'
+            count, seconds = totals.get(function, (0, 0))
+            totals[function] = (count + calls, seconds + self.seconds[stack])
+        return totals
+
+    # Collapsed stacks weighted by time (microseconds) or call count
+    def collapsed(self, metric = 'time'):
+        lines = []
+        for stack in sorted(self.calls):
+            if metric == 'calls':
+                value = self.calls[stack]
+            else:
+                value = round(self.seconds[stack] * 1e6)
+            lines.append('{} {}'.format(';'.join(stack), value))
+        return '\n'.join(lines) + '\n'
+
+    def write_collapsed(self, file_name, metric = 'time'):
+        with open(file_name, 'w') as stack_file:
+            stack_file.write(self.collapsed(metric))
+
+# Profile a whole headless journey render for a seed
+def profile_seed(seed):
+    profiler = PrimitiveProfiler()
+    data = contact_tracer4.data_set(seed, verbose = False)
+    contact_tracer4.tile_cache.clear()
+    with profiler.installed():
+        contact_tracer4.render_headless(data, seed,
+                                        profiler.wrap(HeadlessTurtle()))
+    return profiler
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Command Line---------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Profile the turtle primitives used to draw a journey.')
+    parser.add_argument('seed', type = int)
+    parser.add_argument('--output', default = 'journey.folded',
+                        help = 'collapsed stack file for flame graph tools')
+    parser.add_argument('--metric', choices = ['time', 'calls'],
+                        default = 'time')
+    args = parser.parse_args()
+
+    profiler = profile_seed(args.seed)
+    profiler.write_collapsed(args.output, args.metric)
+
+    print('{:<24}{:>10}{:>12}'.format('function', 'calls', 'seconds'))
+    totals = profiler.by_function()
+    for function in sorted(totals, key = lambda name: -totals[name][1]):
+        calls, seconds = totals[function]
+        print('{:<24}{:>10}{:>12.5f}'.format(function, calls, seconds))
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,85 @@
+from time import perf_counter
+
+#-----Refresh Policies-----------------------------------------------#
+# Decides when visualise should call update() to show the tiles drawn
+# so far.  Updating after every tile makes Tk redraw the canvas for
+# each cell, which is what slows down long journeys the most, so the
+# tiles can instead be shown:
+#   every_tiles - after every n tiles
+#   every_ms - at most every t milliseconds
+#   frame_budget_ms - in frames of roughly this length, counting the
+#                     time update itself takes.  Drawing always gets
+#                     at least as long as the last updates took, so
+#                     the slower the redraws get the more tiles each
+#                     frame shows, and no more than half the time
+#                     goes on redrawing
+#   (nothing) - only once all the tiles are drawn
+
+class RefreshPolicy:
+
+    def __init__(self, every_tiles = None, every_ms = None,
+                 frame_budget_ms = None):
+        chosen = [setting for setting in (every_tiles, every_ms,
+                                          frame_budget_ms)
+                  if setting is not None]
+        if len(chosen) > 1:
+            raise ValueError('Choose only one way of refreshing')
+        self.every_tiles = every_tiles
+        self.every_ms = every_ms
+        self.frame_budget_ms = frame_budget_ms
+        self.start(None)
+
+    # Get ready to refresh with the given update function
+    def start(self, update):
+        self.update = update
+        self.tiles_waiting = 0
+        self.refreshes = 0
+        self.update_ms = 0 # running average of how long update takes
+        self.last_refresh = perf_counter()
+
+    def due(self):
+        if self.every_tiles is not None:
+            return self.tiles_waiting >= self.every_tiles
+        waited_ms = (perf_counter() - self.last_refresh) * 1000
+        if self.every_ms is not None:
+            return waited_ms >= self.every_ms
+        if self.frame_budget_ms is not None:
+            return waited_ms >= max(self.frame_budget_ms - self.update_ms,
+                                    self.update_ms)
+        return False
+
+    def refresh(self):
+        started = perf_counter()
+        self.update()
+        self.last_refresh = perf_counter()
+        update_ms = (self.last_refresh - started) * 1000
+        if self.refreshes == 0:
+            self.update_ms = update_ms
+        else:
+            self.update_ms = 0.8 * self.update_ms + 0.2 * update_ms
+        self.refreshes = self.refreshes + 1
+        self.tiles_waiting = 0
+
+    def tile_drawn(self):
+        self.tiles_waiting = self.tiles_waiting + 1
+        if self.due():
+            self.refresh()
+
+    # Show whatever is still waiting
+    def finish(self):
+        if self.tiles_waiting > 0:
+            self.refresh()
+
+def every_tiles(count = 1):
+    return RefreshPolicy(every_tiles = count)
+
+def every_ms(interval = 100):
+    return RefreshPolicy(every_ms = interval)
+
+def frame_budget(frame_ms = 1000 / 30):
+    return RefreshPolicy(frame_budget_ms = frame_ms)
+
+def at_end():
+    return RefreshPolicy()
+
+#--------------------------------------------------------------------#
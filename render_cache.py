@@ -0,0 +1,141 @@
+import json
+import hashlib
+from os import makedirs, replace, scandir, remove, utime
+from os.path import join, dirname, abspath
+from collections import OrderedDict
+
+import contact_tracer4
+from code_hash import rendering_code_hash
+
+#-----Rendering Journeys---------------------------------------------#
+
+output_formats = ['svg', 'png']
+
+# Draw one journey headlessly and hand back the finished file as bytes
+def render_journey(data, output_format = 'svg', decoration_seed = None):
+    # Seeded tiles are only any use to this journey (see batch_render)
+    if decoration_seed is not None:
+        contact_tracer4.tile_cache.clear()
+    backend = contact_tracer4.render_headless(data, decoration_seed)
+    if output_format == 'png':
+        from png_raster import rasterise_scene, encode_png
+        return encode_png(rasterise_scene(backend))
+    from svg_export import scene_to_svg
+    return scene_to_svg(backend).encode()
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Render Cache---------------------------------------------------#
+# Rendered journeys, looked up by a hash of everything that decides
+# what the picture looks like: the instructions (as plain lists, so
+# tuples and lists give the same key), the grid, the output format,
+# the seed for the tiles' random details and the rendering code
+# itself.  Images live on disk, up to a size limit, with the most
+# recently used ones also kept in memory.  Once a tier is full the
+# least recently used images are dropped from it.
+
+render_cache_version = 1
+
+default_cache_dir = join(dirname(abspath(__file__)), '.render_cache')
+
+def render_key(data, output_format = 'svg', decoration_seed = None):
+    settings = [render_cache_version, rendering_code_hash(),
+                contact_tracer4.geometry.settings(), output_format,
+                decoration_seed,
+                [list(instruction) for instruction in data]]
+    return hashlib.sha256(json.dumps(settings, separators = (',', ':'))
+                          .encode()).hexdigest()
+
+class RenderCache:
+
+    def __init__(self, cache_dir = default_cache_dir,
+                 max_disk_bytes = 256 * 2 ** 20,
+                 max_memory_bytes = 32 * 2 ** 20):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.memory = OrderedDict() # key -> image, least recent first
+        self.memory_bytes = 0
+        # What is on disk already, least recently used first
+        makedirs(cache_dir, exist_ok = True)
+        entries = [entry for entry in scandir(cache_dir)
+                   if entry.is_file() and not entry.name.endswith('.tmp')]
+        entries.sort(key = lambda entry: entry.stat().st_mtime)
+        self.disk = OrderedDict((entry.name, entry.stat().st_size)
+                                for entry in entries)
+        self.disk_bytes = sum(self.disk.values())
+
+    def file_name(self, key, output_format):
+        return key + '.' + output_format
+
+    def remember(self, key, image):
+        if len(image) > self.max_memory_bytes:
+            return
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return
+        self.memory[key] = image
+        self.memory_bytes = self.memory_bytes + len(image)
+        while self.memory_bytes > self.max_memory_bytes:
+            dropped_key, dropped = self.memory.popitem(last = False)
+            self.memory_bytes = self.memory_bytes - len(dropped)
+
+    def get(self, key, output_format = 'svg'):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        name = self.file_name(key, output_format)
+        path = join(self.cache_dir, name)
+        try:
+            with open(path, 'rb') as image_file:
+                image = image_file.read()
+            utime(path) # the file's time is when it was last used
+        except FileNotFoundError:
+            # (possibly removed by another process sharing the folder)
+            if name in self.disk:
+                self.disk_bytes = self.disk_bytes - self.disk.pop(name)
+            return None
+        if name in self.disk:
+            self.disk.move_to_end(name)
+        else:
+            self.disk[name] = len(image)
+            self.disk_bytes = self.disk_bytes + len(image)
+        self.remember(key, image)
+        return image
+
+    def put(self, key, image, output_format = 'svg'):
+        self.remember(key, image)
+        name = self.file_name(key, output_format)
+        path = join(self.cache_dir, name)
+        # Write to a temporary file first so that another process never
+        # sees half an image
+        with open(path + '.tmp', 'wb') as image_file:
+            image_file.write(image)
+        replace(path + '.tmp', path)
+        if name in self.disk:
+            self.disk_bytes = self.disk_bytes - self.disk.pop(name)
+        self.disk[name] = len(image)
+        self.disk_bytes = self.disk_bytes + len(image)
+        while self.disk_bytes > self.max_disk_bytes and len(self.disk) > 1:
+            dropped_name, size = self.disk.popitem(last = False)
+            self.disk_bytes = self.disk_bytes - size
+            try:
+                remove(join(self.cache_dir, dropped_name))
+            except FileNotFoundError:
+                pass
+
+    # The image for a journey, drawing it only if it isn't cached
+    def render(self, data, output_format = 'svg', decoration_seed = None):
+        # Hashing reads the journey, so a streamed one has to be kept to
+        # draw it afterwards
+        data = [list(instruction) for instruction in data]
+        key = render_key(data, output_format, decoration_seed)
+        image = self.get(key, output_format)
+        if image is None:
+            image = render_journey(data, output_format, decoration_seed)
+            self.put(key, image, output_format)
+        return image
+
+#--------------------------------------------------------------------#
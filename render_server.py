@@ -0,0 +1,231 @@
+import json
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import contact_tracer4
+from journey_compiler import moves
+from grid_coordinates import is_column_label, column_label, column_number
+from variant_registry import registry
+from render_cache import output_formats, render_journey, render_key, \
+     RenderCache
+
+#-----Checking Journeys----------------------------------------------#
+
+# Refuse journeys that would keep a worker busy for too long
+max_paints = 10000
+
+# Check a journey has the raw_data shape, and stays on the grid, before
+# it goes anywhere near the drawing code, raising ValueError if not
+def check_journey(data):
+    if not isinstance(data, list) or not data:
+        raise ValueError('A journey must be a non-empty list of instructions')
+    geometry = contact_tracer4.geometry
+    # (longer labels can't be on the grid, and are slow to decode)
+    max_label_length = len(column_label(geometry.grid_width - 1))
+    paints = 0
+    for number, instruction in enumerate(data):
+        if not isinstance(instruction, list) or not instruction:
+            raise ValueError('Instruction {} is not a list'.format(number))
+        opcode = instruction[0]
+        if (number == 0) != (opcode == 'Start'):
+            raise ValueError('Only the first instruction must be a Start')
+        if opcode == 'Start':
+            valid = (len(instruction) == 4 and
+                     is_column_label(instruction[1]) and
+                     len(instruction[1]) <= max_label_length and
+                     type(instruction[2]) == int and
+                     instruction[3] in registry)
+            if valid:
+                column = column_number(instruction[1])
+                row = instruction[2] - 1
+            steps = 1
+        elif opcode == 'Change':
+            valid = (len(instruction) == 2 and
+                     isinstance(instruction[1], str) and
+                     instruction[1] in registry)
+            steps = 1
+        elif opcode in moves:
+            valid = (len(instruction) == 2 and
+                     type(instruction[1]) == int and instruction[1] >= 0)
+            steps = max(instruction[1], 1) if valid else 0
+            if valid:
+                column_step, row_step = moves[opcode]
+                column = column + column_step * instruction[1]
+                row = row + row_step * instruction[1]
+        else:
+            valid = False
+        if not valid:
+            raise ValueError('Instruction {} is malformed: {!r}'.format(
+                number, instruction))
+        if not geometry.contains(column, row):
+            raise ValueError('Instruction {} leaves the grid: {!r}'.format(
+                number, instruction))
+        paints = paints + steps
+        if paints > max_paints:
+            raise ValueError('Journey paints more than {} tiles'.format(
+                max_paints))
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Journey Server-------------------------------------------------#
+# Accepts journeys as JSON lines over a Unix or TCP socket.  Each line
+# is either a journey in the raw_data shape, or an object
+#   {"journey": [...], "format": "svg" or "png", "seed": n, "id": ...}
+# where everything but the journey is optional (the seed is used for
+# the random details of the tiles).  Every request gets back, in the
+# order the requests were sent, a JSON header line
+#   {"id": ..., "format": "svg", "length": n}
+# followed by exactly n bytes of image, or a line {"id": ..., "error": ...}.
+#
+# Repeated journeys can be answered from a RenderCache, otherwise the
+# drawing happens in a pool of worker processes.  At most
+# max_jobs journeys are drawn or waiting for a worker at once across
+# all connections, and each connection may have at most pipeline_depth
+# requests in hand.  Once that is reached the server stops reading
+# from the connection, and it waits for slow readers to take their
+# replies, so a busy client is slowed down rather than filling memory.
+
+class JourneyServer:
+
+    def __init__(self, workers = None, max_jobs = 8, pipeline_depth = 16,
+                 cache = None):
+        self.cache = cache # a RenderCache, if journeys are to be cached
+        # The cache reads and writes files, so it is used from a thread
+        # of its own rather than holding up the event loop (just the
+        # one, as it isn't safe to use from several at once)
+        self.cache_thread = ThreadPoolExecutor(1)
+        # Workers are started as needed, so they mustn't be forked, or
+        # they would inherit (and hold open) any client sockets
+        self.executor = ProcessPoolExecutor(
+            workers, multiprocessing.get_context('spawn'))
+        self.jobs = asyncio.Semaphore(max_jobs)
+        self.pipeline_depth = pipeline_depth
+
+    # Parse a request line, returning its id and job arguments
+    def parse_request(self, line):
+        request = json.loads(line)
+        if isinstance(request, list):
+            request = {'journey': request}
+        if not isinstance(request, dict):
+            raise ValueError('A request must be a journey or an object')
+        output_format = request.get('format', 'svg')
+        if output_format not in output_formats:
+            raise ValueError('Format must be one of ' + str(output_formats))
+        seed = request.get('seed')
+        if seed is not None and type(seed) != int:
+            raise ValueError('The seed must be a whole number')
+        check_journey(request.get('journey'))
+        return request.get('id'), (request['journey'], output_format, seed)
+
+    async def render(self, line):
+        request_id = None
+        try:
+            request_id, job = self.parse_request(line)
+            loop = asyncio.get_running_loop()
+            image = None
+            if self.cache is not None:
+                key = render_key(*job)
+                image = await loop.run_in_executor(
+                    self.cache_thread, self.cache.get, key, job[1])
+            if image is None:
+                async with self.jobs:
+                    image = await loop.run_in_executor(
+                        self.executor, render_journey, *job)
+                if self.cache is not None:
+                    await loop.run_in_executor(
+                        self.cache_thread, self.cache.put, key, image, job[1])
+        except Exception as error:
+            return json.dumps({'id': request_id, 'error': str(error)}) + '\n', b''
+        header = {'id': request_id, 'format': job[1], 'length': len(image)}
+        return json.dumps(header) + '\n', image
+
+    # Send the replies back in request order.  If the client has gone
+    # away, keep taking requests off the queue (without drawing them)
+    # so the reading side never waits on a full queue.
+    async def reply(self, writer, replies):
+        connected = True
+        while True:
+            task = await replies.get()
+            if task is None:
+                return
+            if not connected:
+                task.cancel()
+                continue
+            header, image = await task
+            try:
+                writer.write(header.encode() + image)
+                await writer.drain()
+            except ConnectionError:
+                connected = False
+
+    async def handle_connection(self, reader, writer):
+        replies = asyncio.Queue(self.pipeline_depth)
+        replier = asyncio.create_task(self.reply(writer, replies))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    await replies.put(asyncio.create_task(self.render(line)))
+        except (ConnectionError, ValueError):
+            pass # the client went away or sent an overlong line
+        finally:
+            await replies.put(None)
+            await replier
+            writer.close()
+
+    async def serve(self, unix_path = None, host = '127.0.0.1', port = 8765,
+                    line_limit = 2 ** 24):
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, unix_path, limit = line_limit)
+        else:
+            server = await asyncio.start_server(
+                self.handle_connection, host, port, limit = line_limit)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown()
+        self.cache_thread.shutdown()
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Command Line---------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Serve journey images over a local socket.')
+    parser.add_argument('--unix', metavar = 'PATH',
+                        help = 'listen on a Unix socket instead of TCP')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--workers', type = int,
+                        help = 'drawing processes (default one per core)')
+    parser.add_argument('--max-jobs', type = int, default = 8,
+                        help = 'journeys drawn or queued at once')
+    parser.add_argument('--cache-dir',
+                        help = 'keep rendered journeys in this folder')
+    parser.add_argument('--cache-mb', type = int, default = 256,
+                        help = 'size limit of the cache folder')
+    args = parser.parse_args()
+
+    cache = None
+    if args.cache_dir:
+        cache = RenderCache(args.cache_dir, args.cache_mb * 2 ** 20)
+    server = JourneyServer(args.workers, args.max_jobs, cache = cache)
+    try:
+        asyncio.run(server.serve(args.unix, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,59 @@
+import json
+import hashlib
+from os import makedirs, replace
+from os.path import join, dirname, abspath, isfile
+
+from code_hash import rendering_code_hash
+
+#-----Static Layer Cache---------------------------------------------#
+# Keeps the grid, labels and key (see contact_tracer4's static layer)
+# in a JSON file, so an interactive session only has to read one file
+# and make one drawing call before the journey starts.  The file name
+# depends on the layout settings and on the drawing code itself, so a
+# change to either simply builds a new layer.
+#
+# The layer is drawn by the function passed in (normally
+# contact_tracer4.render_static_layer) rather than by importing the
+# drawing code here, as contact_tracer4 loads this module itself and,
+# when run as a script, would otherwise be loaded a second time.
+
+static_layer_version = 1
+
+default_cache_dir = join(dirname(abspath(__file__)), '.static_layer_cache')
+
+# Layers already loaded in this process
+loaded_layers = {}
+
+# geometry_settings is the layout's GridGeometry.settings()
+def layer_key(geometry_settings, label_spaces, decoration_seed):
+    settings = [static_layer_version, rendering_code_hash(),
+                geometry_settings, label_spaces, decoration_seed]
+    return hashlib.sha256(json.dumps(settings).encode()).hexdigest()[:16]
+
+# The layer for the given layout, built with render_layer(label_spaces,
+# decoration_seed) if it isn't cached yet
+def load_static_layer(render_layer, geometry_settings, label_spaces = False,
+                      decoration_seed = None, cache_dir = None):
+    if cache_dir is None:
+        cache_dir = default_cache_dir
+    key = layer_key(geometry_settings, label_spaces, decoration_seed)
+    if key in loaded_layers:
+        return loaded_layers[key]
+
+    file_name = join(cache_dir, 'static_layer_{}.json'.format(key))
+    if isfile(file_name):
+        with open(file_name) as layer_file:
+            layer = json.load(layer_file)
+    else:
+        layer = render_layer(label_spaces, decoration_seed)
+        # Write to a temporary file first so that another process never
+        # sees half a layer
+        makedirs(cache_dir, exist_ok = True)
+        with open(file_name + '.tmp', 'w') as layer_file:
+            json.dump(layer, layer_file, separators = (',', ':'))
+        replace(file_name + '.tmp', file_name)
+
+    loaded_layers[key] = layer
+    return layer
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,91 @@
+from colours import rgb
+
+#-----SVG Export-----------------------------------------------------#
+# Write a scene drawn with the headless backend to an SVG file.  Every
+# distinct tile is written once as a <symbol> and each cell showing it
+# is just a <use> of that symbol, so the file grows with the number of
+# variants drawn rather than with the number of journey steps.
+#
+# Turtle coordinates have (0, 0) in the middle of the window and the y
+# axis pointing up, so y values are negated on the way out.
+
+# Text anchors matching the alignment options of turtle's write
+text_anchors = {'left': 'start', 'center': 'middle', 'right': 'end'}
+
+# Tk colour names don't all mean the same in SVG (see colours), so
+# every colour is written out as hex
+def svg_colour(colour):
+    return '#{:02x}{:02x}{:02x}'.format(*rgb(colour))
+
+# Keep numbers short, two decimal places is plenty for a screen image
+def svg_number(value):
+    return '%g' % round(value, 2)
+
+def svg_points(points, x = 0, y = 0):
+    return ' '.join(svg_number(point_x + x) + ',' + svg_number(-(point_y + y))
+                    for point_x, point_y in points)
+
+def escape(text):
+    return (text.replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;'))
+
+# Turn one scene item into an SVG element
+def svg_element(item):
+    if item[0] == 'polygon':
+        return '<polygon points="{}" fill="{}"/>'.format(
+            svg_points(item[2]), svg_colour(item[1]))
+    elif item[0] == 'line':
+        return ('<polyline points="{}" fill="none" stroke="{}" '
+                'stroke-width="{}" stroke-linecap="round" '
+                'stroke-linejoin="round"/>').format(
+            svg_points(item[3]), svg_colour(item[1]), svg_number(item[2]))
+    elif item[0] == 'dot':
+        return '<circle cx="{}" cy="{}" r="{}" fill="{}"/>'.format(
+            svg_number(item[1]), svg_number(-item[2]),
+            svg_number(item[3] / 2), svg_colour(item[4]))
+    elif item[0] == 'text':
+        x, y, text, align, font, colour = item[1:]
+        # Turtle anchors text by the bottom of its last line
+        lines = text.split('\n')
+        line_height = font[1] * 1.2
+        first_line = -y - line_height * (len(lines) - 1)
+        spans = ''.join('<tspan x="{}" y="{}">{}</tspan>'.format(
+            svg_number(x - 1), svg_number(first_line + line_height * line_no),
+            escape(line)) for line_no, line in enumerate(lines))
+        return ('<text text-anchor="{}" dominant-baseline="text-after-edge" '
+                'font-family="{}" font-size="{}pt" fill="{}">{}</text>').format(
+            text_anchors[align], font[0], font[1], svg_colour(colour), spans)
+    else:
+        return '<use href="#{}" x="{}" y="{}"/>'.format(
+            item[1], svg_number(item[2]), svg_number(-item[3]))
+
+# Build the whole SVG document for a headless backend's scene
+def scene_to_svg(backend):
+    width, height = backend.window_size
+    lines = ['<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" '
+             'viewBox="{} {} {} {}">'.format(
+                 svg_number(width), svg_number(height),
+                 svg_number(-width / 2), svg_number(-height / 2),
+                 svg_number(width), svg_number(height)),
+             '<rect x="{}" y="{}" width="{}" height="{}" fill="{}"/>'.format(
+                 svg_number(-width / 2), svg_number(-height / 2),
+                 svg_number(width), svg_number(height),
+                 svg_colour(backend.background))]
+
+    # Define each distinct tile once
+    lines.append('<defs>')
+    for name, items in backend.tiles.items():
+        lines.append('<symbol id="{}" overflow="visible">'.format(name))
+        lines.extend(svg_element(item) for item in items)
+        lines.append('</symbol>')
+    lines.append('</defs>')
+
+    lines.extend(svg_element(item) for item in backend.scene())
+    lines.append('</svg>')
+    return '\n'.join(lines) + '\n'
+
+def write_svg(backend, file_name):
+    with open(file_name, 'w') as svg_file:
+        svg_file.write(scene_to_svg(backend))
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,32 @@
+import sys
+import json
+import shutil
+import subprocess
+from glob import glob
+from os.path import join, dirname, abspath
+
+# Runs contact_tracer4 as a script on a headless backend, then prints
+# how many items each recorded tile has
+script_runner = '''
+import sys, json, runpy
+from headless_turtle import HeadlessTurtle
+sys.modules['tk_backend'] = HeadlessTurtle()
+script = runpy.run_path('contact_tracer4.py', run_name = '__main__')
+print(json.dumps({'{}-{}'.format(draw.__name__, size): len(items)
+                  for (draw, size, seed), items
+                  in script['tile_cache'].items()}))
+'''
+
+# Running the program as a script must record real tiles, not empty
+# ones drawn through a second copy of the module.  It runs in a fresh
+# process, on a copy of the code so the static layer is cached there.
+def test_script_records_tiles(tmp_path):
+    for source in glob(join(dirname(abspath(__file__)), '*.py')):
+        shutil.copy(source, tmp_path)
+    result = subprocess.run([sys.executable, '-c', script_runner],
+                            cwd = tmp_path, capture_output = True,
+                            text = True, check = True)
+    tile_sizes = json.loads(result.stdout.splitlines()[-1])
+    assert tile_sizes
+    for name, items in tile_sizes.items():
+        assert items > 0, name + ' recorded nothing'
@@ -0,0 +1,31 @@
+from random import Random
+
+import pytest
+
+from data_generator import raw_data
+from journey_format import JourneyFile, pack_journey, write_journeys
+
+def test_journeys_round_trip(tmp_path):
+    rng = Random(0)
+    journeys = [raw_data(9, 7, rng, verbose = False) for journey in range(20)]
+    journeys.append([['Start', 'ab', 3, 'D'], ['East', 0], ['Change', 'A']])
+    file_name = str(tmp_path / 'journeys.bj')
+    write_journeys(file_name, journeys, 9, 7)
+
+    with JourneyFile(file_name) as journey_file:
+        assert (journey_file.width, journey_file.height) == (9, 7)
+        assert len(journey_file) == len(journeys)
+        for data, journey in zip(journeys, journey_file):
+            assert len(journey) == len(data)
+            assert list(journey) == data
+        assert list(journey_file[-1]) == journeys[-1]
+    # The loop's views are still alive, but they mustn't stop the file
+    # from closing, and can't be read once it is
+    with pytest.raises(ValueError):
+        list(journey)
+
+def test_values_too_big_for_a_record():
+    with pytest.raises(ValueError, match = 'does not fit'):
+        pack_journey([['Start', 'a', 1, 'A'], ['North', 256]])
+    with pytest.raises(ValueError, match = 'does not fit'):
+        pack_journey([['Start', 'a', 300, 'A']])
@@ -0,0 +1,133 @@
+import argparse
+from time import perf_counter
+from multiprocessing import Pool, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+import contact_tracer4
+from variant_registry import registry
+from png_raster import rasterise_tile
+
+#-----Tile Atlas-----------------------------------------------------#
+# Every variant's tile rasterised ahead of time into RGBA patches (see
+# png_raster.rasterise_tile), one shared memory block per variant and
+# size, so any process can attach to them and blit from them without
+# copying or rasterising the tiles again.
+#
+# An atlas is described by a small manifest giving, for each tile name
+# (see contact_tracer4.tile_name):
+#   (variant code, size, decoration seed, scale, block name,
+#    patch shape, origin x, origin y)
+# A patch only fits a scene rasterised at the scale it was made at, so
+# tiles() checks the scale it is asked for against the manifest.
+# The display lists the tiles were rasterised from are kept too, so
+# the tile cache can be filled from them instead of drawing the tiles
+# turtle step by turtle step again.
+
+class TileAtlas:
+
+    def __init__(self, manifest, display_lists = None, owner = False):
+        self.manifest = manifest
+        self.display_lists = display_lists or {}
+        self.owner = owner # whether closing the atlas frees the blocks
+        self.blocks = {}
+        self.patches = {}
+        for name, entry in manifest.items():
+            block_name, shape, origin_x, origin_y = entry[4:]
+            block = SharedMemory(block_name)
+            self.blocks[name] = block
+            self.patches[name] = (np.ndarray(shape, np.uint8, block.buf),
+                                  origin_x, origin_y)
+
+    # The rasterised tiles by name, as png_raster.rasterise_scene takes
+    # them for a scene at the given scale.  They are views of the shared
+    # blocks, so must not be kept once the atlas is closed.
+    def tiles(self, scale = 1):
+        for name, entry in self.manifest.items():
+            if entry[3] != scale:
+                raise ValueError('Tile {} was rasterised at scale {}, not {}'
+                                 .format(name, entry[3], scale))
+        return self.patches
+
+    # Fill contact_tracer4's tile cache from the recorded display lists
+    def warm_tile_cache(self):
+        for name, items in self.display_lists.items():
+            code, size, decoration_seed = self.manifest[name][:3]
+            contact_tracer4.tile_cache[(registry[code].draw, size,
+                                        decoration_seed)] = items
+
+    def close(self):
+        self.patches = {}
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks = {}
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Pre-rendering Tiles--------------------------------------------#
+# Each (variant, size) tile is recorded and rasterised by a worker
+# process of its own, which leaves the patch in a new shared memory
+# block and hands back only its manifest entry and display list.  The
+# tiles don't depend on each other, so with enough cores the whole
+# atlas takes about as long as the slowest tile.
+
+def prerender_tile(job):
+    code, size, decoration_seed, scale = job
+    draw = registry[code].draw
+    items = contact_tracer4.cached_tile(draw, size, decoration_seed)
+    patch, origin_x, origin_y = rasterise_tile(items, scale)
+    block = SharedMemory(create = True, size = patch.nbytes)
+    np.ndarray(patch.shape, np.uint8, block.buf)[:] = patch
+    block.close()
+    entry = (code, size, decoration_seed, scale, block.name, patch.shape,
+             origin_x, origin_y)
+    return contact_tracer4.tile_name(draw, size, decoration_seed), entry, items
+
+def prerender_tiles(sizes = None, decoration_seed = None, scale = 1,
+                    workers = None):
+    if sizes is None:
+        sizes = [contact_tracer4.geometry.cell_size,
+                 contact_tracer4.geometry.panel_size]
+    jobs = [(code, size, decoration_seed, scale)
+            for code in registry for size in sorted(set(sizes))]
+    # The blocks have to outlive the workers that made them, so they
+    # must be tracked by this process's resource tracker, which the
+    # workers share as long as it is running before they start
+    resource_tracker.ensure_running()
+    with Pool(workers) as pool:
+        results = pool.map(prerender_tile, jobs, chunksize = 1)
+    manifest = {}
+    display_lists = {}
+    for name, entry, items in results:
+        manifest[name] = entry
+        display_lists[name] = items
+    return TileAtlas(manifest, display_lists, owner = True)
+
+#--------------------------------------------------------------------#
+
+
+
+#-----Command Line---------------------------------------------------#
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Time pre-rendering every variant tile in parallel.')
+    parser.add_argument('sizes', type = int, nargs = '+')
+    parser.add_argument('--workers', type = int)
+    parser.add_argument('--seed', type = int)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    atlas = prerender_tiles(args.sizes, args.seed, workers = args.workers)
+    elapsed = perf_counter() - start
+    total_bytes = sum(patch.nbytes for patch, x, y in atlas.patches.values())
+    print('Pre-rendered', len(atlas.manifest), 'tiles ({} bytes) in {:.3f}s'
+          .format(total_bytes, elapsed))
+    atlas.close()
+
+#--------------------------------------------------------------------#
@@ -0,0 +1,18 @@
+from turtle import *
+from display_list import draw_on_canvas
+
+#-----Tk Drawing Backend---------------------------------------------#
+# The normal on-screen backend: the turtle module's own functions plus
+# ways to put recorded items straight onto the Tk canvas, either as a
+# tile at the turtle's current position or where they were recorded.
+
+def place_tile(name, items):
+    screen = getscreen()
+    draw_on_canvas(getcanvas(), items, xcor(), ycor(),
+                   screen.xscale, screen.yscale)
+
+def draw_items(items):
+    screen = getscreen()
+    draw_on_canvas(getcanvas(), items, 0, 0, screen.xscale, screen.yscale)
+
+#--------------------------------------------------------------------#
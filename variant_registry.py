@@ -0,0 +1,41 @@
+#-----Variant Registry-----------------------------------------------#
+# Every variant a journey can show, in the order they appear in the
+# key: its one-letter code, its label in the key and the function that
+# draws it.  Drawing, the key and the data generator all work from
+# this table, so a new variant only has to be registered here, e.g.
+#   register_variant('E', 'Desert Trip', desert_trip)
+# A drawing function takes the image size and a random.Random for any
+# random details, and draws the image with its bottom left corner at
+# the turtle's position.
+#
+# The data generator needs the codes without loading the drawing code,
+# so the original four variants are listed here and contact_tracer4
+# fills in their drawing functions.
+
+class Variant:
+
+    def __init__(self, code, label, draw = None):
+        self.code = code
+        self.label = label
+        self.draw = draw
+
+    # What the key says about it, e.g. 'A. Leaving Home'
+    def key_label(self):
+        return '{}. {}'.format(self.code, self.label)
+
+# Variants by code (dictionaries keep the order they were added in)
+registry = {}
+
+def register_variant(code, label, draw = None):
+    registry[code] = Variant(code, label, draw)
+    return registry[code]
+
+def variant_codes():
+    return list(registry)
+
+register_variant('A', 'Leaving Home')
+register_variant('B', 'Mountain Trip')
+register_variant('C', 'Beach Trip')
+register_variant('D', 'Ocean Trip')
+
+#--------------------------------------------------------------------#